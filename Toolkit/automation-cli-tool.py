@@ -4,72 +4,516 @@ Personal Automation Toolkit - Terminal Edition
 A simple CLI interface for all your automation scripts
 """
 
+import argparse
+import ast
+import asyncio
+import codecs
+import contextlib
+import hashlib
+import importlib
 import os
 import sys
+import socket
+import socketserver
+import stat
+import struct
 import subprocess
 import json
+import sqlite3
+import tempfile
+import threading
+from collections import deque
 from datetime import datetime
 import time
 
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools')
+MANIFEST_FILE = os.path.join(TOOLS_DIR, '.tool_manifest.json')
+DEFAULT_TIMEOUT = 300  # Seconds, for tools that don't declare their own
+STREAM_CHUNK = 64 * 1024  # Bytes read from a tool's pipe at a time
+OUTPUT_TAIL_LINES = 200  # Lines of each stream kept for the result
+KILL_GRACE = 5  # Seconds between SIGTERM and SIGKILL when stopping a tool
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tool_cache.sqlite')
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 16 * 1024 * 1024  # Stored output across all entries
+FINGERPRINT_MAX_FILES = 20000  # Runs over bigger trees aren't cached (0 = no limit)
+PROFILE_MODES = ('cpu', 'memory')
+# The socket lives in a directory only we can enter: XDG_RUNTIME_DIR, or a 0700 one in /tmp
+DAEMON_SOCKET = (os.path.join(os.environ['XDG_RUNTIME_DIR'], 'devtoolkit.sock') if os.environ.get('XDG_RUNTIME_DIR')
+                 else os.path.join(tempfile.gettempdir(), f"devtoolkit-{os.getuid()}", 'daemon.sock'))
+DAEMON_IDLE_TIMEOUT = 600  # Seconds without clients before the daemon exits
+DAEMON_START_WAIT = 10  # Seconds a client waits for an auto-started daemon
+SUMMARY_TOP = 10  # Profile entries shown by summarize_metrics
+DEFAULT_PARALLEL = os.cpu_count() or 1  # Concurrent jobs in batch mode
+BATCH_ICONS = {'ok': '✅', 'failed': '❌', 'timed_out': '⏰', 'cancelled': '⏹️ ',
+               'invalid': '🚫', 'skipped': '⏭️ ', 'pending': '⏳'}
+
+# Tools without a script yet. A script in tools/ that defines TOOL_INFO
+# replaces its entry here (and adds new tools) via discover_tools().
+PLACEHOLDER_TOOLS = {
+    3: {
+        'name': 'Email Campaign Manager',
+        'description': 'Send automated emails with templates',
+        'script': 'email_automation.py',
+        'inputs': [
+            {'name': 'recipient_list', 'prompt': 'Recipients CSV file path: ', 'type': 'str'},
+            {'name': 'template', 'prompt': 'Template (welcome/followup/newsletter): ', 'type': 'str'},
+            {'name': 'subject', 'prompt': 'Email subject: ', 'type': 'str'},
+            {'name': 'test_mode', 'prompt': 'Test mode only? (y/n): ', 'type': 'bool'}
+        ]
+    }
+}
+
+def read_tool_info(script_path):
+    """Read a script's TOOL_INFO literal without importing it"""
+    try:
+        with open(script_path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=script_path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id == 'TOOL_INFO'):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                return None
+    return None
+
+def coerce_value(value, type_name):
+    """Convert a raw input to its declared type (raises ValueError)"""
+    if type_name == 'bool':
+        if isinstance(value, bool):
+            return value
+        return str(value).lower() in ['y', 'yes', 'true', '1']
+    elif type_name == 'int':
+        if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+            raise ValueError(value)
+        return int(value)
+    elif type_name == 'float':
+        if isinstance(value, bool):
+            raise ValueError(value)
+        return float(value)
+    else:  # str
+        if not isinstance(value, (str, int, float)):
+            raise ValueError(value)
+        return str(value)
+
+def conditions_hold(conditions, inputs):
+    """Whether inputs match {input_name: value or [values]} (strings ignoring case).
+    
+    Used by an input's 'when' (it is only prompted for when the earlier
+    inputs match; otherwise its default is used) and by a conditional
+    'path' (the input is only a path when they match).
+    """
+    for name, allowed in conditions.items():
+        allowed = allowed if isinstance(allowed, list) else [allowed]
+        value = inputs.get(name)
+        if isinstance(value, str):
+            value = value.lower()
+        if value not in allowed:
+            return False
+    return True
+
+def tool_timeout(tool, inputs):
+    """Timeout in seconds for a run (None = no limit).
+    
+    TOOL_INFO['timeout'] may be a number, None, or a dict deriving it from
+    an input, e.g. {'input': 'duration', 'scale': 60, 'grace': 60} for a
+    duration given in minutes.
+    """
+    spec = tool.get('timeout', DEFAULT_TIMEOUT)
+    if isinstance(spec, dict):
+        try:
+            return float(inputs[spec['input']]) * spec.get('scale', 1) + spec.get('grace', 0)
+        except (KeyError, TypeError, ValueError):
+            return DEFAULT_TIMEOUT
+    return spec
+
+class OutputTail:
+    """Text stream that keeps the last OUTPUT_TAIL_LINES lines written to it.
+    
+    Everything is also passed through to `passthrough` when given, so it
+    can stand in for sys.stdout while a tool runs.
+    """
+    def __init__(self, passthrough=None):
+        self.passthrough = passthrough
+        self.lines = deque(maxlen=OUTPUT_TAIL_LINES)
+        self.partial = ''
+        
+    def write(self, text):
+        if self.passthrough is not None:
+            self.passthrough.write(text)
+        lines = (self.partial + text).split('\n')
+        self.partial = lines.pop()
+        self.lines.extend(lines)
+        if len(self.partial) > STREAM_CHUNK:  # Don't let one endless line grow unbounded
+            self.lines.append(self.partial)
+            self.partial = ''
+        return len(text)
+        
+    def flush(self):
+        if self.passthrough is not None:
+            self.passthrough.flush()
+            
+    def isatty(self):
+        return self.passthrough is not None and self.passthrough.isatty()
+        
+    def getlines(self):
+        return list(self.lines) + ([self.partial] if self.partial else [])
+
+async def pump_stream(stream, tail):
+    """Copy a pipe into an OutputTail as data arrives"""
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    while True:
+        chunk = await stream.read(STREAM_CHUNK)
+        if not chunk:
+            break
+        tail.write(decoder.decode(chunk))
+        tail.flush()
+    tail.write(decoder.decode(b'', final=True))
+
+async def stop_process(proc):
+    """Terminate a child, escalating to kill if it doesn't exit"""
+    if proc.returncode is not None:
+        return
+    proc.terminate()
+    try:
+        await asyncio.wait_for(proc.wait(), KILL_GRACE)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+async def stream_subprocess(cmd, timeout=None, echo=True):
+    """Run cmd, streaming stdout/stderr live with bounded memory.
+    
+    With echo=False nothing is written to the terminal (batch jobs running
+    side by side); the tails are still collected. Returns a result dict
+    with the exit code, whether the run timed out or was cancelled, and
+    the last OUTPUT_TAIL_LINES lines of each stream (partial output when
+    the run was stopped early).
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        env=dict(os.environ, PYTHONUNBUFFERED='1')
+    )
+    result = {'returncode': None, 'timed_out': False, 'cancelled': False}
+    stdout = OutputTail(sys.stdout if echo else None)
+    stderr = OutputTail(sys.stderr if echo else None)
+    
+    work = asyncio.gather(
+        pump_stream(proc.stdout, stdout),
+        pump_stream(proc.stderr, stderr),
+        proc.wait(),
+    )
+    try:
+        await asyncio.wait_for(work, timeout)
+    except asyncio.TimeoutError:
+        result['timed_out'] = True
+    except asyncio.CancelledError:
+        result['cancelled'] = True
+    finally:
+        await stop_process(proc)
+        work.cancel()
+        await asyncio.gather(work, return_exceptions=True)
+    
+    result['returncode'] = proc.returncode
+    result['stdout_tail'] = stdout.getlines()
+    result['stderr_tail'] = stderr.getlines()
+    return result
+
+class TreeTooLarge(Exception):
+    """A tree has more files than the cache is willing to fingerprint"""
+
+def absolute_paths(tool, inputs):
+    """Return inputs with every file and folder path made absolute.
+    
+    The daemon runs tools in its own working directory, so a client
+    resolves paths against its own before handing a run over. Paths are
+    the inputs marked 'path': True (or 'path': {conditions} when the input
+    is only a path for some runs, see conditions_hold), the tool's
+    'path_settings' (optional settings, with their defaults filled in) and
+    metrics_file.
+    """
+    settings = dict(tool.get('path_settings') or {}, metrics_file=None)
+    resolved = dict(inputs)
+    for name, default in settings.items():
+        if resolved.get(name) is None and default is not None:
+            resolved[name] = default
+    names = [config['name'] for config in tool['inputs']
+             if config.get('path') is True or (config.get('path') and conditions_hold(config['path'], inputs))]
+    names += list(settings)
+    for name in names:
+        if isinstance(resolved.get(name), str) and resolved[name]:
+            resolved[name] = os.path.abspath(resolved[name])
+    return resolved
+
+def fingerprint_path(path, max_files=None):
+    """Cheap fingerprint of a file or directory tree (names, sizes, mtimes).
+    
+    Directory names are included too, so a directory appearing where a
+    file is expected (or going away) changes the fingerprint. Content
+    isn't read, so this costs one stat per file. With max_files
+    set, TreeTooLarge is raised as soon as the walk has seen more files
+    than that, so a huge tree never costs a full walk.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if not os.path.exists(path):
+        return None
+    if not os.path.isdir(path):
+        st = os.stat(path)
+        return f"{st.st_size}:{st.st_mtime_ns}"
+    
+    seen = 0
+    for root, dirs, files in os.walk(path):
+        seen += len(files)
+        if max_files and seen > max_files:
+            raise TreeTooLarge(path)
+        dirs.sort()
+        for name in dirs:
+            digest.update(f"{os.path.relpath(os.path.join(root, name), path)}{os.sep}\n".encode())
+        for name in sorted(files):
+            full_path = os.path.join(root, name)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            digest.update(f"{os.path.relpath(full_path, path)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+def format_bytes(num_bytes):
+    """Human readable byte count"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.0f} B" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+def summarize_metrics(metrics_file):
+    """Print the phase timings, counters and profile from a tool's metrics JSON"""
+    try:
+        with open(metrics_file, 'r') as f:
+            report = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read metrics file {metrics_file}: {e}")
+        return 1
+    
+    wall_time = report.get('wall_time') or 0
+    print(f"\n📈 Instrumentation: {report.get('tool')} ({wall_time:.3f} seconds wall time)")
+    print("-" * 60)
+    spans = sorted(report.get('spans', {}).items(), key=lambda item: item[1]['total'], reverse=True)
+    if spans:
+        print(f"   {'Phase':<16}{'Calls':>9}{'Total s':>11}{'Share':>8}{'Mean ms':>11}{'Max ms':>11}")
+        for name, span in spans:
+            share = span['total'] / wall_time * 100 if wall_time else 0
+            print(f"   {name:<16}{span['calls']:>9}{span['total']:>11.3f}{share:>7.0f}%"
+                  f"{span['mean'] * 1000:>11.2f}{span['max'] * 1000:>11.2f}")
+    for name, value in sorted(report.get('counters', {}).items()):
+        rate = value / wall_time if wall_time else 0
+        if name.startswith('bytes'):
+            print(f"   🔢 {name}: {format_bytes(value)} ({format_bytes(rate)}/s)")
+        else:
+            print(f"   🔢 {name}: {value} ({rate:.1f}/s)")
+    
+    if report.get('cpu_profile'):
+        print(f"   🔥 Top functions by cumulative time:")
+        for row in report['cpu_profile'][:SUMMARY_TOP]:
+            print(f"      {row['cumulative']:>9.3f}s {row['self']:>9.3f}s self  {row['calls']:>8}x  {row['function']}")
+    if report.get('memory_profile'):
+        print(f"   🧠 Peak traced memory: {format_bytes(report.get('memory_peak', 0))}; largest live allocations:")
+        for row in report['memory_profile'][:SUMMARY_TOP]:
+            print(f"      {format_bytes(row['size']):>10} in {row['count']:>7} blocks  {row['location']}")
+    return 0
+
+class ResultCache:
+    """LRU cache of successful tool runs in a small SQLite database.
+    
+    Only tools with TOOL_INFO['cache'] set are cached. An entry is keyed by
+    the script's content hash and the normalized inputs, and also stores
+    fingerprints of the inputs marked 'fingerprint': True (e.g. source and
+    output folders) taken right after the run: a lookup only hits while
+    those paths still look exactly as the run left them. Fingerprinting
+    stats every file, so runs over trees with more than max_files files are
+    not cached at all; they then cost at most max_files stats. Entries
+    beyond CACHE_MAX_ENTRIES or CACHE_MAX_BYTES of output are evicted least
+    recently used first.
+    """
+    def __init__(self, db_path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES,
+                 max_files=FINGERPRINT_MAX_FILES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._conn = None
+        self._script_hashes = {}
+        
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, tool TEXT, fingerprints TEXT, '
+                'result TEXT, size INTEGER, last_used REAL)'
+            )
+        return self._conn
+        
+    def script_hash(self, script_path):
+        st = os.stat(script_path)
+        cached = self._script_hashes.get(script_path)
+        if cached and cached[0] == (st.st_size, st.st_mtime_ns):
+            return cached[1]
+        with open(script_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._script_hashes[script_path] = ((st.st_size, st.st_mtime_ns), digest)
+        return digest
+        
+    def key(self, tool, inputs):
+        """Cache key for a run, or None if the tool isn't cacheable"""
+        if not tool.get('cache'):
+            return None
+        script_path = os.path.join(TOOLS_DIR, tool['script'])
+        payload = json.dumps({'script': self.script_hash(script_path), 'inputs': inputs},
+                             sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+        
+    def fingerprint_inputs(self, tool, inputs):
+        return [config['name'] for config in tool['inputs']
+                if config.get('fingerprint') and inputs.get(config['name'])]
+        
+    def fingerprints(self, tool, inputs):
+        """Fingerprint every 'fingerprint' input (raises TreeTooLarge)"""
+        return {name: fingerprint_path(str(inputs[name]), self.max_files)
+                for name in self.fingerprint_inputs(tool, inputs)}
+        
+    def unchanged(self, tool, inputs, stored):
+        """Whether the fingerprinted paths still match, stopping at the first difference"""
+        names = self.fingerprint_inputs(tool, inputs)
+        if sorted(names) != sorted(stored):
+            return False
+        try:
+            return all(fingerprint_path(str(inputs[name]), self.max_files) == stored[name]
+                       for name in names)
+        except TreeTooLarge:
+            return False
+        
+    def lookup(self, tool, inputs):
+        """Return the cached result for this run, or None"""
+        key = self.key(tool, inputs)
+        if key is None:
+            return None
+        row = self.conn.execute(
+            'SELECT fingerprints, result FROM results WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if not self.unchanged(tool, inputs, json.loads(row[0])):
+            self.conn.execute('DELETE FROM results WHERE key = ?', (key,))
+            self.conn.commit()
+            return None
+        self.conn.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+        self.conn.commit()
+        # Same shape as a fresh result: only complete, clean runs are ever stored
+        return dict(json.loads(row[1]), timed_out=False, cancelled=False, cached=True)
+        
+    def store(self, tool, inputs, result):
+        """Remember a finished run; only clean, complete successes are kept"""
+        key = self.key(tool, inputs)
+        if (key is None or result['returncode'] != 0
+                or result['timed_out'] or result['cancelled']):
+            return
+        try:
+            fingerprints = self.fingerprints(tool, inputs)
+        except TreeTooLarge as e:
+            print(f"ℹ️  Not cached: {e} has more than {self.max_files:,} files (see --fingerprint-limit)")
+            return
+        payload = json.dumps({k: result.get(k) for k in
+                              ('returncode', 'execution_time', 'stdout_tail', 'stderr_tail')})
+        self.conn.execute(
+            'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+            (key, tool['script'], json.dumps(fingerprints),
+             payload, len(payload), time.time())
+        )
+        self.evict()
+        self.conn.commit()
+        
+    def evict(self):
+        """Drop least recently used entries until within both limits"""
+        count, size = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        for key, entry_size in self.conn.execute(
+            'SELECT key, size FROM results ORDER BY last_used'
+        ).fetchall():
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            self.conn.execute('DELETE FROM results WHERE key = ?', (key,))
+            count -= 1
+            size -= entry_size
+            
+    def invalidate(self, script=None):
+        """Drop all entries, or only those for one tool script. Returns the count"""
+        if script is None:
+            cursor = self.conn.execute('DELETE FROM results')
+        else:
+            cursor = self.conn.execute('DELETE FROM results WHERE tool = ?', (script,))
+        self.conn.commit()
+        return cursor.rowcount
+
 class AutomationToolkit:
-    def __init__(self):
-        self.tools = {
-            1: {
-                'name': 'File Batch Processor',
-                'description': 'Process multiple files with custom operations',
-                'script': 'file_processor.py',
-                'inputs': [
-                    {'name': 'source_folder', 'prompt': 'Enter source folder path: ', 'type': 'str'},
-                    {'name': 'output_folder', 'prompt': 'Enter output folder path: ', 'type': 'str'},
-                    {'name': 'operation', 'prompt': 'Operation (rename/convert/compress): ', 'type': 'str'},
-                    {'name': 'pattern', 'prompt': 'File pattern (e.g., *.txt): ', 'type': 'str'},
-                    {'name': 'recursive', 'prompt': 'Include subfolders? (y/n): ', 'type': 'bool'}
-                ]
-            },
-            2: {
-                'name': 'Data Report Generator',
-                'description': 'Generate reports from CSV/Excel data',
-                'script': 'data_analyzer.py',
-                'inputs': [
-                    {'name': 'data_file', 'prompt': 'Enter data file path: ', 'type': 'str'},
-                    {'name': 'report_type', 'prompt': 'Report type (summary/detailed/trends): ', 'type': 'str'},
-                    {'name': 'output_format', 'prompt': 'Output format (PDF/Excel/HTML): ', 'type': 'str'},
-                    {'name': 'include_charts', 'prompt': 'Include charts? (y/n): ', 'type': 'bool'}
-                ]
-            },
-            3: {
-                'name': 'Email Campaign Manager',
-                'description': 'Send automated emails with templates',
-                'script': 'email_automation.py',
-                'inputs': [
-                    {'name': 'recipient_list', 'prompt': 'Recipients CSV file path: ', 'type': 'str'},
-                    {'name': 'template', 'prompt': 'Template (welcome/followup/newsletter): ', 'type': 'str'},
-                    {'name': 'subject', 'prompt': 'Email subject: ', 'type': 'str'},
-                    {'name': 'test_mode', 'prompt': 'Test mode only? (y/n): ', 'type': 'bool'}
-                ]
-            },
-            4: {
-                'name': 'System Monitor',
-                'description': 'Monitor system resources and generate alerts',
-                'script': 'system_monitor.py',
-                'inputs': [
-                    {'name': 'check_type', 'prompt': 'Check (cpu/memory/disk/all): ', 'type': 'str'},
-                    {'name': 'threshold', 'prompt': 'Alert threshold (%): ', 'type': 'int'},
-                    {'name': 'duration', 'prompt': 'Monitor duration (minutes): ', 'type': 'int'}
-                ]
-            },
-            5: {
-                'name': 'Database Backup',
-                'description': 'Backup databases with compression',
-                'script': 'db_backup.py',
-                'inputs': [
-                    {'name': 'db_type', 'prompt': 'Database type (mysql/postgres/sqlite): ', 'type': 'str'},
-                    {'name': 'db_name', 'prompt': 'Database name: ', 'type': 'str'},
-                    {'name': 'backup_location', 'prompt': 'Backup location: ', 'type': 'str'},
-                    {'name': 'compress', 'prompt': 'Compress backup? (y/n): ', 'type': 'bool'}
-                ]
-            }
-        }
+    def __init__(self, mode='inprocess', cache=None, metrics_file=None, profile=None,
+                 socket_path=DAEMON_SOCKET):
+        self.mode = mode
+        self.cache = cache
+        self.metrics_file = metrics_file
+        self.profile = profile
+        self.socket_path = socket_path
+        self._modules = {}
+        self.tools = self.discover_tools()
+        
+    def discover_tools(self):
+        """Build the tool registry from tools/*.py, using a cached manifest.
+        
+        Scripts are never imported here: their TOOL_INFO is read from the
+        source with ast, and the result is cached by file size and mtime so
+        unchanged scripts aren't even parsed again.
+        """
+        try:
+            with open(MANIFEST_FILE, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        
+        entries = {}
+        filenames = sorted(os.listdir(TOOLS_DIR)) if os.path.isdir(TOOLS_DIR) else []
+        for filename in filenames:
+            if not filename.endswith('.py') or filename.startswith('_'):
+                continue
+            st = os.stat(os.path.join(TOOLS_DIR, filename))
+            cached = manifest.get(filename)
+            if cached and cached['mtime_ns'] == st.st_mtime_ns and cached['size'] == st.st_size:
+                entries[filename] = cached
+            else:
+                entries[filename] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                                     'info': read_tool_info(os.path.join(TOOLS_DIR, filename))}
+        
+        if entries != manifest:
+            try:
+                with open(MANIFEST_FILE, 'w') as f:
+                    json.dump(entries, f, indent=1)
+            except OSError:
+                pass  # Read-only install: discovery still works, just uncached
+        
+        tools = {num: dict(tool) for num, tool in PLACEHOLDER_TOOLS.items()}
+        for filename, entry in entries.items():
+            info = entry['info']
+            if not info:
+                continue
+            num = info.get('id') or max(tools, default=0) + 1
+            tools[num] = dict(info, script=filename)
+        return dict(sorted(tools.items()))
         
     def clear_screen(self):
         os.system('clear' if os.name == 'posix' else 'cls')
@@ -111,14 +555,9 @@ class AutomationToolkit:
             try:
                 value = input(f" {input_config['prompt']}")
                 
-                if input_config['type'] == 'bool':
-                    return value.lower() in ['y', 'yes', 'true', '1']
-                elif input_config['type'] == 'int':
-                    return int(value)
-                elif input_config['type'] == 'float':
-                    return float(value)
-                else:  # str
-                    return value
+                if value == '' and 'default' in input_config:
+                    return input_config['default']
+                return coerce_value(value, input_config['type'])
                     
             except ValueError:
                 print(f" ❌ Invalid input. Please enter a valid {input_config['type']}.")
@@ -130,56 +569,199 @@ class AutomationToolkit:
         
         inputs = {}
         for input_config in tool['inputs']:
-            inputs[input_config['name']] = self.get_user_input(input_config)
+            if conditions_hold(input_config.get('when', {}), inputs):
+                inputs[input_config['name']] = self.get_user_input(input_config)
+            else:
+                inputs[input_config['name']] = input_config['default']
             
         return inputs
         
+    def instrument_inputs(self, tool, inputs, suffix=None):
+        """Add the metrics/profile inputs when instrumentation was requested.
+        
+        Returns (inputs, metrics_file); metrics_file is None when it wasn't.
+        """
+        if not (self.metrics_file or self.profile):
+            return inputs, None
+        metrics_file = self.metrics_file or f"{os.path.splitext(tool['script'])[0]}_metrics.json"
+        if suffix:
+            root, ext = os.path.splitext(metrics_file)
+            metrics_file = f"{root}.{suffix}{ext or '.json'}"
+        return dict(inputs, metrics_file=metrics_file, profile=self.profile), metrics_file
+        
     def run_tool(self, tool, inputs):
-        """Execute the tool with given inputs"""
-        script_path = os.path.join('tools', tool['script'])
+        """Execute the tool with given inputs, returning a result dict"""
+        script_path = os.path.join(TOOLS_DIR, tool['script'])
+        inputs, metrics_file = self.instrument_inputs(tool, inputs)
         
         # Check if script exists
         if not os.path.exists(script_path):
             print(f"\n⚠️  Script not found: {script_path}")
             print("   Creating placeholder script...")
             self.create_placeholder_script(script_path, tool, inputs)
-            return
+            return None
             
         print(f"\n🚀 Executing: {tool['name']}")
         print("-" * 60)
         
-        try:
-            # Convert inputs to JSON for passing to script
-            inputs_json = json.dumps(inputs)
-            
-            # Run the script
-            start_time = time.time()
-            result = subprocess.run(
-                [sys.executable, script_path, inputs_json],
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-            
-            execution_time = time.time() - start_time
-            
-            if result.returncode == 0:
-                print(f"✅ Success! Completed in {execution_time:.2f} seconds")
-                if result.stdout:
-                    print(f"📄 Output:\n{result.stdout}")
+        # Instrumented runs always execute: a replay would have nothing to measure
+        use_cache = self.cache is not None and metrics_file is None
+        if use_cache:
+            cached = self.cache.lookup(tool, inputs)
+            if cached is not None:
+                self.replay_cached(cached)
+                return cached
+        
+        start_time = time.time()
+        if self.mode == 'daemon' and tool.get('entry'):
+            result = self.run_remote(tool, inputs)
+        elif self.mode == 'inprocess' and tool.get('entry'):
+            result = self.run_in_process(tool, inputs)
+        else:
+            result = self.run_subprocess(tool, inputs, script_path)
+        
+        if use_cache:
+            self.cache.store(tool, inputs, result)
+        if metrics_file:
+            if os.path.exists(metrics_file) and os.path.getmtime(metrics_file) >= start_time - 1:
+                summarize_metrics(metrics_file)
+                print(f"   📄 Metrics saved to {metrics_file}")
             else:
-                print(f"❌ Error (Exit code: {result.returncode})")
-                if result.stderr:
-                    print(f"🔍 Error details:\n{result.stderr}")
-                    
-        except subprocess.TimeoutExpired:
-            print("⏰ Script execution timed out (5 minutes)")
+                print(f"   ⚠️  {tool['name']} didn't write metrics (no instrumentation support?)")
+        return result
+        
+    def replay_cached(self, result):
+        """Show a cached run's output as if it had just run"""
+        for line in result['stdout_tail']:
+            print(line)
+        for line in result['stderr_tail']:
+            print(line, file=sys.stderr)
+        print(f"♻️  Cached result (inputs unchanged; originally took {result['execution_time']:.2f} seconds)")
+        
+    def load_entry(self, tool):
+        """Import a tool module on first use and return its entry function"""
+        module_name = os.path.splitext(tool['script'])[0]
+        mtime = os.stat(os.path.join(TOOLS_DIR, tool['script'])).st_mtime_ns
+        
+        if TOOLS_DIR not in sys.path:
+            sys.path.insert(0, TOOLS_DIR)
+        
+        cached = self._modules.get(module_name)
+        if cached is None:
+            module = importlib.import_module(module_name)
+        elif cached[1] != mtime:
+            module = importlib.reload(cached[0])  # Script edited since it was loaded
+        else:
+            module = cached[0]
+        self._modules[module_name] = (module, mtime)
+        return getattr(module, tool['entry'])
+        
+    def run_in_process(self, tool, inputs):
+        """Call the tool's entry function directly (no interpreter startup).
+        
+        Output goes straight to the terminal, with its tail kept for the
+        result. In-process runs can't be pre-empted, so they have no
+        timeout; use subprocess mode for that.
+        """
+        start_time = time.time()
+        result = {'returncode': 0, 'timed_out': False, 'cancelled': False}
+        stdout, stderr = OutputTail(sys.stdout), OutputTail(sys.stderr)
+        try:
+            entry = self.load_entry(tool)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                result['returncode'] = entry(dict(inputs)) or 0
+        except ImportError as e:
+            print(f"❌ Could not load {tool['script']}: {e}")
+            result['returncode'] = 1
+        except SystemExit as e:
+            result['returncode'] = e.code if isinstance(e.code, int) else 1
+        except KeyboardInterrupt:
+            print("\n⏹️  Execution interrupted")
+            result.update(returncode=130, cancelled=True)
         except Exception as e:
             print(f"💥 Execution failed: {str(e)}")
+            result['returncode'] = 1
+        
+        result['execution_time'] = time.time() - start_time
+        result['stdout_tail'] = stdout.getlines()
+        result['stderr_tail'] = stderr.getlines()
+        self.report_result(result)
+        return result
+        
+    def run_subprocess(self, tool, inputs, script_path):
+        """Run the script in a separate interpreter, streaming its output live"""
+        timeout = tool_timeout(tool, inputs)
+        if timeout:
+            print(f"⏱️  Timeout: {timeout:.0f} seconds")
+        
+        start_time = time.time()
+        try:
+            result = asyncio.run(stream_subprocess(
+                [sys.executable, script_path, json.dumps(inputs)], timeout))
+        except Exception as e:
+            print(f"💥 Execution failed: {str(e)}")
+            return {'returncode': 1, 'timed_out': False, 'cancelled': False,
+                    'execution_time': time.time() - start_time}
+        
+        result['execution_time'] = time.time() - start_time
+        self.report_result(result, timeout)
+        return result
+        
+    def run_remote(self, tool, inputs):
+        """Run the tool in the warm daemon, streaming its output back.
+        
+        The daemon is started in the background if it isn't running; if it
+        can't be reached the tool runs in-process instead. Paths in the
+        inputs are sent as absolute paths, since the daemon's working
+        directory isn't ours.
+        """
+        start_time = time.time()
+        try:
+            sock = connect_daemon(self.socket_path, autostart=True)
+        except OSError as e:
+            print(f"⚠️  Toolkit daemon unavailable ({e}); running in-process")
+            return self.run_in_process(tool, inputs)
+        
+        result = None
+        try:
+            with sock, sock.makefile('rb') as replies:
+                sock.sendall(json.dumps({'action': 'run', 'script': tool['script'],
+                                         'inputs': absolute_paths(tool, inputs)}).encode() + b'\n')
+                for line in replies:
+                    message = json.loads(line)
+                    if message['type'] == 'output':
+                        stream = sys.stderr if message['stream'] == 'stderr' else sys.stdout
+                        stream.write(message['data'])
+                        stream.flush()
+                    elif message['type'] == 'result':
+                        result = message['result']
+        except KeyboardInterrupt:
+            # Closing the socket makes the daemon stop the run at its next output
+            print("\n⏹️  Execution interrupted")
+            result = {'returncode': 130, 'timed_out': False, 'cancelled': True}
+        except (OSError, ValueError) as e:
+            print(f"💥 Lost connection to the toolkit daemon: {e}")
+        
+        if result is None:
+            result = {'returncode': 1, 'timed_out': False, 'cancelled': False}
+        result.setdefault('execution_time', time.time() - start_time)
+        self.report_result(result)
+        return result
+        
+    def report_result(self, result, timeout=None):
+        """Print the outcome line for a finished run"""
+        if result['timed_out']:
+            print(f"⏰ Script execution timed out after {timeout:.0f} seconds (partial output above)")
+        elif result['cancelled']:
+            print(f"⏹️  Execution cancelled after {result['execution_time']:.2f} seconds (partial output above)")
+        elif result['returncode'] == 0:
+            print(f"✅ Success! Completed in {result['execution_time']:.2f} seconds")
+        else:
+            print(f"❌ Error (Exit code: {result['returncode']})")
             
     def create_placeholder_script(self, script_path, tool, inputs):
         """Create a placeholder script if it doesn't exist"""
-        os.makedirs('tools', exist_ok=True)
+        os.makedirs(TOOLS_DIR, exist_ok=True)
         
         placeholder_content = f'''#!/usr/bin/env python3
 """
@@ -249,6 +831,188 @@ if __name__ == "__main__":
         # Execute the tool
         self.run_tool(tool, inputs)
         
+    def find_tool(self, ref):
+        """Look a tool up by number, name or script filename"""
+        if isinstance(ref, int) or (isinstance(ref, str) and ref.isdigit()):
+            return self.tools.get(int(ref))
+        for tool in self.tools.values():
+            if str(ref).lower() in (tool['name'].lower(), tool['script'].lower(),
+                                    os.path.splitext(tool['script'])[0].lower()):
+                return tool
+        return None
+        
+    def validate_inputs(self, tool, inputs):
+        """Check job inputs against the tool's schema.
+        
+        Returns (values, errors): declared inputs are coerced to their type
+        and defaults filled in; extra keys pass through untouched since
+        tools accept optional settings beyond their prompts.
+        """
+        values = dict(inputs)
+        errors = []
+        for input_config in tool['inputs']:
+            name = input_config['name']
+            if name not in inputs:
+                if 'default' in input_config:
+                    values[name] = input_config['default']
+                else:
+                    errors.append(f"missing input '{name}'")
+                continue
+            try:
+                values[name] = coerce_value(inputs[name], input_config['type'])
+            except (TypeError, ValueError):
+                errors.append(f"'{name}' should be {input_config['type']}, got {inputs[name]!r}")
+        return values, errors
+        
+    def load_jobs(self, job_file):
+        """Read and validate a job file.
+        
+        The file is JSON: a list of jobs, or {"jobs": [...]}. Each job has
+        "tool" (number, name or script), "inputs", and optionally "name" and
+        "priority" (higher runs first; ties keep file order).
+        """
+        with open(job_file, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('jobs', [])
+        
+        jobs = []
+        for index, spec in enumerate(data):
+            job = {'index': index, 'name': f"job-{index + 1}", 'status': 'pending',
+                   'priority': 0, 'errors': []}
+            if not isinstance(spec, dict):
+                job.update(status='invalid', errors=['job must be an object'])
+                jobs.append(job)
+                continue
+            job['name'] = str(spec.get('name', job['name']))
+            
+            tool = self.find_tool(spec.get('tool'))
+            try:
+                job['priority'] = float(spec.get('priority', 0))
+            except (TypeError, ValueError):
+                job['errors'].append(f"bad priority {spec.get('priority')!r}")
+            if tool is None:
+                job['errors'].append(f"unknown tool {spec.get('tool')!r}")
+            elif not os.path.exists(os.path.join(TOOLS_DIR, tool['script'])):
+                job['errors'].append(f"tool script missing: {tool['script']}")
+            elif not isinstance(spec.get('inputs', {}), dict):
+                job['errors'].append('inputs must be an object')
+            else:
+                job['tool'] = tool
+                job['inputs'], errors = self.validate_inputs(tool, spec.get('inputs', {}))
+                job['errors'].extend(errors)
+            if job['errors']:
+                job['status'] = 'invalid'
+            jobs.append(job)
+        return jobs
+        
+    async def _run_jobs(self, jobs, parallel):
+        """Run valid jobs on `parallel` workers, highest priority first"""
+        queue = asyncio.PriorityQueue()
+        for job in jobs:
+            if job['status'] == 'pending':
+                queue.put_nowait((-job['priority'], job['index'], job))
+        stopping = asyncio.Event()
+        batch_start = time.time()
+        
+        async def worker():
+            while not stopping.is_set() and not queue.empty():
+                _, _, job = queue.get_nowait()
+                tool = job['tool']
+                print(f"▶️  [{job['name']}] {tool['name']}")
+                job['started'] = time.time() - batch_start
+                job['inputs'], job['metrics_file'] = self.instrument_inputs(tool, job['inputs'], job['name'])
+                use_cache = self.cache is not None and job['metrics_file'] is None
+                result = self.cache.lookup(tool, job['inputs']) if use_cache else None
+                if result is None:
+                    result = await stream_subprocess(
+                        [sys.executable, os.path.join(TOOLS_DIR, tool['script']), json.dumps(job['inputs'])],
+                        tool_timeout(tool, job['inputs']), echo=False)
+                    if use_cache:
+                        self.cache.store(tool, job['inputs'], result)
+                job['duration'] = time.time() - batch_start - job['started']
+                job.update(result)
+                
+                if result['cancelled']:
+                    job['status'] = 'cancelled'
+                    stopping.set()
+                elif result['timed_out']:
+                    job['status'] = 'timed_out'
+                else:
+                    job['status'] = 'ok' if result['returncode'] == 0 else 'failed'
+                print(f"{BATCH_ICONS[job['status']]} [{job['name']}] {job['status']} "
+                      f"in {job['duration']:.2f}s (exit {job['returncode']})"
+                      + (" ♻️  cached" if job.get('cached') else ""))
+        
+        try:
+            await asyncio.gather(*(worker() for _ in range(parallel)))
+        except asyncio.CancelledError:
+            stopping.set()
+        for job in jobs:
+            if job['status'] == 'pending':
+                job['status'] = 'skipped'
+        
+    def run_batch(self, job_file, parallel=DEFAULT_PARALLEL, report_file=None):
+        """Run a job file headlessly and report the aggregate results.
+        
+        Jobs always run as subprocesses so they can proceed side by side,
+        be timed out individually and keep their output apart. Returns 0
+        when every job succeeded, 1 otherwise.
+        """
+        try:
+            jobs = self.load_jobs(job_file)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read job file {job_file}: {e}")
+            return 1
+        
+        parallel = max(1, parallel)
+        print(f"📋 {len(jobs)} jobs from {job_file} ({parallel} at a time)")
+        for job in jobs:
+            if job['status'] == 'invalid':
+                print(f"{BATCH_ICONS['invalid']} [{job['name']}] " + '; '.join(job['errors']))
+        print("-" * 60)
+        
+        start_time = time.time()
+        asyncio.run(self._run_jobs(jobs, parallel))
+        wall_time = time.time() - start_time
+        
+        counts = {}
+        for job in jobs:
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        report = {
+            'job_file': os.path.abspath(job_file),
+            'finished': datetime.now().isoformat(timespec='seconds'),
+            'parallel': parallel,
+            'wall_time': round(wall_time, 3),
+            'job_time': round(sum(job.get('duration', 0) for job in jobs), 3),
+            'counts': counts,
+            'jobs': [{
+                'name': job['name'],
+                'tool': job['tool']['name'] if 'tool' in job else None,
+                'priority': job['priority'],
+                'status': job['status'],
+                'returncode': job.get('returncode'),
+                'cached': job.get('cached', False),
+                'metrics_file': job.get('metrics_file'),
+                'started': round(job['started'], 3) if 'started' in job else None,
+                'duration': round(job['duration'], 3) if 'duration' in job else None,
+                'errors': job['errors'],
+                'stdout_tail': job.get('stdout_tail', []),
+                'stderr_tail': job.get('stderr_tail', []),
+            } for job in jobs],
+        }
+        
+        print("-" * 60)
+        print(f"📊 Batch finished in {wall_time:.2f}s (job time {report['job_time']:.2f}s)")
+        for status, count in sorted(counts.items()):
+            print(f"   {BATCH_ICONS[status]} {status}: {count}")
+        if report_file:
+            with open(report_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"📄 Report written to {report_file}")
+        
+        return 0 if counts.get('ok', 0) == len(jobs) else 1
+        
     def main_loop(self):
         """Main application loop"""
         while True:
@@ -257,18 +1021,18 @@ if __name__ == "__main__":
             self.print_menu()
             
             try:
-                choice = input("\n🎯 Select a tool (0-5): ")
+                choice = input(f"\n🎯 Select a tool (0-{max(self.tools)}): ")
                 choice = int(choice)
                 
                 if choice == 0:
                     print("\n👋 Thanks for using the Automation Toolkit!")
                     print("🚀 Keep automating and stay productive!")
                     break
-                elif 1 <= choice <= len(self.tools):
+                elif choice in self.tools:
                     self.run_selected_tool(choice)
                     input("\n⏎ Press Enter to continue...")
                 else:
-                    print("\n❌ Invalid selection! Please choose 0-5.")
+                    print(f"\n❌ Invalid selection! Please choose 0-{max(self.tools)}.")
                     time.sleep(2)
                     
             except ValueError:
@@ -278,8 +1042,357 @@ if __name__ == "__main__":
                 print("\n\n👋 Goodbye!")
                 break
 
+def check_private(path, kind):
+    """Raise PermissionError unless path is ours and closed to other users"""
+    st = os.lstat(path)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077 or not kind(st.st_mode):
+        raise PermissionError(f"{path} must be owned by you and not accessible to others")
+
+def private_socket_dir(socket_path):
+    """Create the socket's directory if needed (mode 0700) and make sure it is private"""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    check_private(directory, stat.S_ISDIR)
+
+def peer_uid(sock):
+    """uid of the process at the other end of a Unix socket (None where the OS can't tell)"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    return struct.unpack('3i', creds)[1]
+
+class ClientGone(Exception):
+    """The client that asked the daemon for a run has disconnected"""
+
+class RoutedStream:
+    """Stand-in for sys.stdout/sys.stderr inside the daemon.
+    
+    Writes from a thread serving a request go to that request's client;
+    anything else (the daemon's own log) goes to the original stream.
+    """
+    def __init__(self, name, fallback):
+        self.name = name
+        self.fallback = fallback
+        self.local = threading.local()
+        
+    def write(self, text):
+        send = getattr(self.local, 'send', None)
+        if send is None:
+            return self.fallback.write(text)
+        send({'type': 'output', 'stream': self.name, 'data': text})
+        return len(text)
+        
+    def flush(self):
+        if getattr(self.local, 'send', None) is None:
+            self.fallback.flush()
+            
+    def isatty(self):
+        return False
+
+class RunGate:
+    """Shared/exclusive admission for runs inside the daemon.
+    
+    Instrumentation totals (and tracemalloc) are process-wide, so a run
+    that records metrics waits for the runs in progress, keeps new ones
+    out, and then has the process to itself. Ordinary runs share it.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.shared = 0
+        self.exclusive = False
+        self.waiting = 0  # Exclusive runs queued; new shared runs let them go first
+        
+    def _free(self, exclusive):
+        if exclusive:
+            return not self.exclusive and self.shared == 0
+        return not self.exclusive and self.waiting == 0
+        
+    @contextlib.contextmanager
+    def hold(self, exclusive=False, on_wait=None):
+        with self.cond:
+            if not self._free(exclusive) and on_wait:
+                on_wait()
+            if exclusive:
+                self.waiting += 1
+                self.cond.wait_for(lambda: self._free(True))
+                self.waiting -= 1
+                self.exclusive = True
+            else:
+                self.cond.wait_for(lambda: self._free(False))
+                self.shared += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                if exclusive:
+                    self.exclusive = False
+                else:
+                    self.shared -= 1
+                self.cond.notify_all()
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """One client connection: a single JSON request line, JSON reply lines"""
+    def handle(self):
+        if peer_uid(self.connection) not in (None, os.getuid()):
+            return  # Another user got hold of the socket; serve nothing
+        server = self.server
+        server.touch(+1)
+        lock = threading.Lock()
+        
+        def send(message):
+            try:
+                with lock:
+                    self.wfile.write(json.dumps(message).encode() + b'\n')
+                    self.wfile.flush()
+            except OSError as e:
+                raise ClientGone(str(e))
+        
+        try:
+            request = json.loads(self.rfile.readline() or b'{}')
+            action = request.get('action')
+            if action == 'ping':
+                send({'type': 'pong', 'pid': os.getpid(), 'active': server.active,
+                      'modules': sorted(server.toolkit._modules)})
+            elif action == 'stop':
+                send({'type': 'stopping'})
+                threading.Thread(target=server.shutdown, daemon=True).start()
+            elif action == 'run':
+                send({'type': 'result', 'result': server.run_request(request, send)})
+            else:
+                send({'type': 'error', 'error': f"Unknown action: {action}"})
+        except (ValueError, ClientGone):
+            pass
+        finally:
+            server.touch(-1)
+
+class ToolDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Long-lived server that runs tools in-process for thin clients.
+    
+    Tool modules stay imported between runs, along with whatever state they
+    keep at module level (e.g. the system monitor's shared ProcessTracker
+    with its psutil handles and CPU baselines). Every connection gets its
+    own thread, so several clients can run tools at once; each run's
+    output is routed back to its own client. Runs that record metrics
+    are the exception and run alone (see RunGate). The daemon exits after
+    idle_timeout seconds with no connected clients.
+    """
+    daemon_threads = True
+    
+    def __init__(self, socket_path=DAEMON_SOCKET, idle_timeout=DAEMON_IDLE_TIMEOUT):
+        self.toolkit = AutomationToolkit(mode='inprocess')
+        self.idle_timeout = idle_timeout
+        self.active = 0
+        self.last_active = time.monotonic()
+        self.state_lock = threading.Lock()
+        self.gate = RunGate()
+        
+        private_socket_dir(socket_path)
+        if os.path.lexists(socket_path):
+            try:
+                connect_daemon(socket_path).close()
+                raise OSError(f"a daemon is already listening on {socket_path}")
+            except ConnectionError:
+                os.remove(socket_path)  # Left behind by a daemon that died
+        # Created 0600 from the start, so nobody else can connect before a chmod
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, DaemonHandler)
+        finally:
+            os.umask(old_umask)
+        
+    def touch(self, delta):
+        with self.state_lock:
+            self.active += delta
+            self.last_active = time.monotonic()
+            
+    def run_request(self, request, send):
+        """Run one tool for a client, returning the result dict"""
+        self.toolkit.tools = self.toolkit.discover_tools()
+        tool = self.toolkit.find_tool(request.get('script'))
+        if tool is None or not tool.get('entry'):
+            return {'returncode': 1, 'timed_out': False, 'cancelled': False,
+                    'stdout_tail': [], 'stderr_tail': [f"Unknown tool: {request.get('script')}"]}
+        
+        tails = {'stdout': OutputTail(), 'stderr': OutputTail()}
+        def route(message):
+            tails[message['stream']].write(message['data'])
+            send(message)
+        
+        def waiting():
+            print("⏳ Waiting for other runs in the daemon (metrics need it to themselves)")
+        
+        inputs = dict(request.get('inputs', {}))
+        instrumented = bool(inputs.get('metrics_file') or inputs.get('profile'))
+        print(f"[{datetime.now():%H:%M:%S}] ▶️  {tool['name']}")
+        result = {'returncode': 0, 'timed_out': False, 'cancelled': False}
+        start_time = time.time()
+        sys.stdout.local.send = sys.stderr.local.send = route
+        try:
+            entry = self.toolkit.load_entry(tool)
+            with self.gate.hold(exclusive=instrumented, on_wait=waiting):
+                result['returncode'] = entry(inputs) or 0
+        except ClientGone:
+            result.update(returncode=130, cancelled=True)
+        except SystemExit as e:
+            result['returncode'] = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            try:
+                print(f"💥 Execution failed: {str(e)}")
+            except ClientGone:
+                pass
+            result['returncode'] = 1
+        finally:
+            sys.stdout.local.send = sys.stderr.local.send = None
+        
+        result['execution_time'] = time.time() - start_time
+        result['stdout_tail'] = tails['stdout'].getlines()
+        result['stderr_tail'] = tails['stderr'].getlines()
+        print(f"[{datetime.now():%H:%M:%S}] {'⏹️ ' if result['cancelled'] else '✅' if result['returncode'] == 0 else '❌'} "
+              f"{tool['name']} (exit {result['returncode']}, {result['execution_time']:.2f}s)")
+        return result
+        
+    def watch_idle(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 5))
+            with self.state_lock:
+                idle = self.active == 0 and time.monotonic() - self.last_active >= self.idle_timeout
+            if idle:
+                print(f"💤 No clients for {self.idle_timeout:.0f} seconds, shutting down")
+                self.shutdown()
+                return
+                
+    def serve(self):
+        sys.stdout = RoutedStream('stdout', sys.stdout)
+        sys.stderr = RoutedStream('stderr', sys.stderr)
+        print(f"🛰️  Toolkit daemon listening on {self.server_address} (pid {os.getpid()})")
+        threading.Thread(target=self.watch_idle, daemon=True).start()
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            if os.path.exists(self.server_address):
+                os.remove(self.server_address)
+            sys.stdout, sys.stderr = sys.stdout.fallback, sys.stderr.fallback
+        print("👋 Toolkit daemon stopped")
+
+def connect_daemon(socket_path=DAEMON_SOCKET, autostart=False):
+    """Connect to the daemon, starting one in the background if asked.
+    
+    Only a socket in a private directory, owned by us and served by a
+    process running as us, is accepted; anything else raises
+    PermissionError, since whoever serves it would see our tool inputs.
+    """
+    def attempt():
+        check_private(os.path.dirname(os.path.abspath(socket_path)), stat.S_ISDIR)
+        check_private(socket_path, stat.S_ISSOCK)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+            if peer_uid(sock) not in (None, os.getuid()):
+                raise PermissionError(f"{socket_path} is served by another user")
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    
+    try:
+        return attempt()
+    except (FileNotFoundError, ConnectionError):
+        if not autostart:
+            raise ConnectionRefusedError(f"no toolkit daemon on {socket_path}")
+    
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), '--daemon', '--socket', socket_path],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+    deadline = time.monotonic() + DAEMON_START_WAIT
+    while True:
+        try:
+            return attempt()
+        except (FileNotFoundError, ConnectionError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+def daemon_request(socket_path, action):
+    """Send a control request (ping/stop) and return the reply"""
+    with connect_daemon(socket_path) as sock, sock.makefile('rb') as replies:
+        sock.sendall(json.dumps({'action': action}).encode() + b'\n')
+        return json.loads(replies.readline())
+
 def main():
-    toolkit = AutomationToolkit()
+    parser = argparse.ArgumentParser(description='Personal Automation Toolkit')
+    parser.add_argument('--subprocess', action='store_true',
+                        help='run every tool in its own interpreter instead of in-process')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always run tools, ignoring and not storing cached results')
+    parser.add_argument('--clear-cache', nargs='?', const='', metavar='TOOL',
+                        help='drop cached results (all, or for one tool) and exit')
+    parser.add_argument('--fingerprint-limit', type=int, default=FINGERPRINT_MAX_FILES, metavar='N',
+                        help='only cache runs whose fingerprinted folders hold at most N files '
+                             f'(0 = no limit, default: {FINGERPRINT_MAX_FILES})')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='record phase timings and counters of each run to this JSON file')
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help='also profile runs with cProfile (cpu) or tracemalloc (memory)')
+    parser.add_argument('--summarize', metavar='FILE',
+                        help='print the summary of a metrics JSON file and exit')
+    parser.add_argument('--use-daemon', action='store_true',
+                        help='run tools in the warm background daemon (started on demand)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='run the toolkit daemon in the foreground')
+    parser.add_argument('--stop-daemon', action='store_true',
+                        help='stop a running toolkit daemon and exit')
+    parser.add_argument('--socket', default=DAEMON_SOCKET,
+                        help=f'daemon socket path (default: {DAEMON_SOCKET})')
+    parser.add_argument('--idle-timeout', type=float, default=DAEMON_IDLE_TIMEOUT,
+                        help='seconds without clients before the daemon exits')
+    parser.add_argument('--jobs', metavar='FILE',
+                        help='run the jobs in a JSON job file without prompting, then exit')
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL,
+                        help=f'jobs to run at once with --jobs (default: {DEFAULT_PARALLEL})')
+    parser.add_argument('--report', metavar='FILE',
+                        help='write the aggregate --jobs results to this JSON file')
+    args = parser.parse_args()
+    
+    if args.summarize:
+        sys.exit(summarize_metrics(args.summarize))
+    
+    if args.daemon:
+        try:
+            ToolDaemon(args.socket, args.idle_timeout).serve()
+        except OSError as e:
+            print(f"❌ Cannot start daemon: {e}")
+            sys.exit(1)
+        return
+    
+    if args.stop_daemon:
+        try:
+            daemon_request(args.socket, 'stop')
+            print("🛑 Toolkit daemon stopping")
+        except OSError:
+            print(f"ℹ️  No toolkit daemon running on {args.socket}")
+        return
+    
+    mode = 'subprocess' if args.subprocess else 'daemon' if args.use_daemon else 'inprocess'
+    cache = None if args.no_cache else ResultCache(max_files=args.fingerprint_limit)
+    toolkit = AutomationToolkit(mode=mode, cache=cache, metrics_file=args.metrics,
+                                profile=args.profile, socket_path=args.socket)
+    if args.clear_cache is not None:
+        cache = cache or ResultCache()
+        if args.clear_cache:
+            tool = toolkit.find_tool(args.clear_cache)
+            if tool is None:
+                print(f"❌ Unknown tool: {args.clear_cache}")
+                sys.exit(1)
+            removed = cache.invalidate(tool['script'])
+        else:
+            removed = cache.invalidate()
+        print(f"🗑️  Removed {removed} cached results")
+        return
+    if args.jobs:
+        sys.exit(toolkit.run_batch(args.jobs, args.parallel, args.report))
     toolkit.main_loop()
 
 if __name__ == "__main__":
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Toolkit Benchmark Suite
+Reproducible performance benchmarks for the file processor and system monitor
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools')
+
+OPERATIONS = ['rename', 'convert', 'compress', 'organize']
+SCENARIOS = ['tiny', 'huge', 'deep', 'mixed']
+
+# Tree sizes per scale. Everything is generated from a fixed seed, so two runs
+# at the same scale and seed process byte-identical inputs.
+SCALES = {
+    'small': {'tiny_files': 2000, 'huge_files': 2, 'huge_size': 8 * 1024 * 1024,
+              'deep_levels': 25, 'deep_files': 4, 'mixed_files': 600, 'monitor_samples': 200},
+    'medium': {'tiny_files': 20000, 'huge_files': 3, 'huge_size': 64 * 1024 * 1024,
+               'deep_levels': 60, 'deep_files': 8, 'mixed_files': 5000, 'monitor_samples': 1000},
+    'large': {'tiny_files': 200000, 'huge_files': 4, 'huge_size': 512 * 1024 * 1024,
+              'deep_levels': 120, 'deep_files': 16, 'mixed_files': 40000, 'monitor_samples': 5000},
+}
+
+LATENCY_SAMPLE_LIMIT = 2000  # Files timed one by one for latency percentiles
+MIXED_EXTENSIONS = ['.txt', '.log', '.csv', '.json', '.bin', '.jpg', '']
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'disk', 'cpu', 'memory', 'alert',
+         'ok', 'warn', 'error', 'über', 'naïve', 'café', '日本', '😀']
+
+def text_block(rng, size):
+    """Build roughly size bytes of multi-line UTF-8 text"""
+    lines = []
+    total = 0
+    while total < size:
+        line = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 14))) + '\n'
+        lines.append(line)
+        total += len(line.encode('utf-8'))
+    return ''.join(lines).encode('utf-8')
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+def generate_tiny(root, rng, scale):
+    """Many small text files spread over directories of 1000"""
+    total = 0
+    block = text_block(rng, 4096)
+    for i in range(scale['tiny_files']):
+        size = rng.randint(16, 1024)
+        start = rng.randint(0, len(block) - size)
+        total += write_file(os.path.join(root, f"d{i // 1000:04d}", f"tiny_{i:06d}.txt"),
+                            block[start:start + size])
+    return scale['tiny_files'], total
+
+def generate_huge(root, rng, scale):
+    """A few large text files written in 1 MiB blocks"""
+    total = 0
+    block = text_block(rng, 1024 * 1024)
+    for i in range(scale['huge_files']):
+        path = os.path.join(root, f"huge_{i}.txt" if i % 2 == 0 else f"huge_{i}.log")
+        os.makedirs(root, exist_ok=True)
+        with open(path, 'wb') as f:
+            written = 0
+            while written < scale['huge_size']:
+                # Vary each block a little so compression sees realistic input
+                header = f"# block {written // len(block)} of file {i}\n".encode('utf-8')
+                f.write(header)
+                f.write(block)
+                written += len(header) + len(block)
+        total += written
+    return scale['huge_files'], total
+
+def generate_deep(root, rng, scale):
+    """A single deeply nested chain of directories with a few files per level"""
+    total = 0
+    count = 0
+    path = root
+    for level in range(scale['deep_levels']):
+        path = os.path.join(path, f"level_{level:03d}")
+        for i in range(scale['deep_files']):
+            total += write_file(os.path.join(path, f"file_{i}.txt"), text_block(rng, rng.randint(64, 4096)))
+            count += 1
+    return count, total
+
+def generate_mixed(root, rng, scale):
+    """Mixed extensions and sizes, with about a third duplicated content"""
+    total = 0
+    originals = []
+    for i in range(scale['mixed_files']):
+        ext = rng.choice(MIXED_EXTENSIONS)
+        path = os.path.join(root, f"group_{i % 37:02d}", f"item_{i:06d}{ext}")
+        if originals and rng.random() < 0.33:
+            data = rng.choice(originals)
+        elif ext in ('.bin', '.jpg'):
+            data = rng.randbytes(int(rng.lognormvariate(9, 1.5)) % (4 * 1024 * 1024))
+        else:
+            data = text_block(rng, int(rng.lognormvariate(8, 1.5)) % (4 * 1024 * 1024))
+        if len(originals) < 200:
+            originals.append(data)
+        total += write_file(path, data)
+    return scale['mixed_files'], total
+
+GENERATORS = {
+    'tiny': generate_tiny,
+    'huge': generate_huge,
+    'deep': generate_deep,
+    'mixed': generate_mixed,
+}
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+def latency_stats(durations):
+    """Summarize durations (seconds) as millisecond percentiles"""
+    values = sorted(durations)
+    return {
+        'count': len(values),
+        'p50_ms': percentile(values, 50) * 1000,
+        'p90_ms': percentile(values, 90) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+        'max_ms': (values[-1] * 1000) if values else 0.0,
+    }
+
+def peak_rss_kb():
+    """Peak resident set size of this process and its finished children"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == 'darwin':  # ru_maxrss is bytes on macOS, KB on Linux
+        own, children = own // 1024, children // 1024
+    return {'peak_rss_kb': own, 'peak_rss_children_kb': children}
+
+def run_file_case(case):
+    """Benchmark one process_files operation on one generated tree"""
+    sys.path.insert(0, TOOLS_DIR)
+    import file_processor
+
+    inputs = {
+        'source_folder': case['source'],
+        'output_folder': case['output'],
+        'operation': case['operation'],
+        'pattern': '*',
+        'recursive': True,
+        'workers': case['workers'],
+    }
+    inputs.update(case.get('extra_inputs', {}))
+
+    # End-to-end throughput, fresh output folder every repeat
+    durations = []
+    for _ in range(case['repeat']):
+        shutil.rmtree(case['output'], ignore_errors=True)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            file_processor.process_files(dict(inputs))
+            durations.append(time.perf_counter() - start)
+
+    # Per-file latency on a deterministic sample of the tree
+    shutil.rmtree(case['output'], ignore_errors=True)
+    os.makedirs(case['output'], exist_ok=True)
+    options = {key: inputs[key] for key in inputs if key not in
+               ('source_folder', 'output_folder', 'operation', 'pattern', 'recursive')}
+    sample = sorted(entry.path for entry in file_processor.walk_files(case['source']))
+    sample = sample[::max(1, len(sample) // LATENCY_SAMPLE_LIMIT)][:LATENCY_SAMPLE_LIMIT]
+    latencies = []
+    for path in sample:
+        start = time.perf_counter()
+        file_processor.process_single_file(path, case['output'], case['operation'], options)
+        latencies.append(time.perf_counter() - start)
+    shutil.rmtree(case['output'], ignore_errors=True)
+
+    best = min(durations)
+    result = {
+        'seconds': durations,
+        'best_seconds': best,
+        'files_per_sec': case['files'] / best if best > 0 else 0.0,
+        'mb_per_sec': case['bytes'] / (1024 * 1024) / best if best > 0 else 0.0,
+        'latency': latency_stats(latencies),
+    }
+    result.update(peak_rss_kb())
+    return result
+
+def run_monitor_case(case):
+    """Benchmark the system_monitor sampling step"""
+    sys.path.insert(0, TOOLS_DIR)
+    try:
+        import system_monitor
+    except ImportError:
+        return {'skipped': 'psutil not installed'}
+
+    # Prime the CPU baseline so every timed sample is a non-blocking delta
+    system_monitor.collect_metrics('all', cpu_interval=None)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(case['samples']):
+        sample_start = time.perf_counter()
+        system_monitor.collect_metrics('all', cpu_interval=None)
+        latencies.append(time.perf_counter() - sample_start)
+    elapsed = time.perf_counter() - start
+
+    result = {
+        'best_seconds': elapsed,
+        'samples_per_sec': case['samples'] / elapsed if elapsed > 0 else 0.0,
+        'latency': latency_stats(latencies),
+    }
+    result.update(peak_rss_kb())
+    return result
+
+def run_case_isolated(case):
+    """Run a case in a fresh interpreter so peak RSS belongs to that case alone"""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-case', json.dumps(case)],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def throughput_of(result):
+    return result.get('files_per_sec', result.get('samples_per_sec'))
+
+def compare_results(current, baseline, tolerance):
+    """Return a list of regressions (throughput down by more than tolerance)"""
+    previous = {r['name']: r for r in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(result['name'])
+        if not old or throughput_of(old) is None or throughput_of(result) is None:
+            continue
+        old_rate = throughput_of(old)
+        new_rate = throughput_of(result)
+        if old_rate > 0 and new_rate < old_rate * (1 - tolerance):
+            regressions.append({
+                'name': result['name'],
+                'baseline': old_rate,
+                'current': new_rate,
+                'change_pct': (new_rate - old_rate) / old_rate * 100,
+            })
+    return regressions
+
+def run_benchmarks(args):
+    scale = SCALES[args.scale]
+    rng = random.Random(args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='toolkit-bench-')
+    operations = [op for op in args.ops.split(',') if op]
+    scenarios = [sc for sc in args.scenarios.split(',') if sc]
+    extra_inputs = json.loads(args.inputs) if args.inputs else {}
+
+    print(f"🏁 Toolkit Benchmarks ({args.scale}, seed {args.seed})")
+    print(f"📁 Work directory: {workdir}")
+    print("-" * 50)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'workers': args.workers,
+            'repeat': args.repeat,
+            'extra_inputs': extra_inputs,
+        },
+        'results': [],
+    }
+
+    try:
+        for scenario in scenarios:
+            source = os.path.join(workdir, scenario)
+            shutil.rmtree(source, ignore_errors=True)
+            print(f"🏗️  Generating '{scenario}' tree...", flush=True)
+            files, total_bytes = GENERATORS[scenario](source, rng, scale)
+
+            for operation in operations:
+                case = {
+                    'kind': 'file', 'source': source, 'output': os.path.join(workdir, 'out'),
+                    'operation': operation, 'files': files, 'bytes': total_bytes,
+                    'workers': args.workers, 'repeat': args.repeat, 'extra_inputs': extra_inputs,
+                }
+                result = run_case_isolated(case)
+                result.update({'name': f"{scenario}/{operation}", 'files': files, 'bytes': total_bytes})
+                report['results'].append(result)
+                if 'error' in result:
+                    print(f"   ❌ {result['name']}: {result['error']}")
+                else:
+                    print(f"   ⏱️  {result['name']}: {result['files_per_sec']:.0f} files/s, "
+                          f"{result['mb_per_sec']:.1f} MB/s, p99 {result['latency']['p99_ms']:.2f} ms, "
+                          f"peak RSS {result['peak_rss_kb'] / 1024:.0f} MB", flush=True)
+
+            shutil.rmtree(source, ignore_errors=True)
+
+        if not args.skip_monitor:
+            result = run_case_isolated({'kind': 'monitor', 'samples': scale['monitor_samples']})
+            result['name'] = 'monitor/sample'
+            report['results'].append(result)
+            if 'skipped' in result or 'error' in result:
+                print(f"   ⚠️  monitor/sample: {result.get('skipped', result.get('error'))}")
+            else:
+                print(f"   ⏱️  monitor/sample: {result['samples_per_sec']:.0f} samples/s, "
+                      f"p99 {result['latency']['p99_ms']:.3f} ms")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        report['regressions'] = regressions
+        print("-" * 50)
+        if regressions:
+            status = 1
+            for reg in regressions:
+                print(f"   📉 {reg['name']}: {reg['baseline']:.0f} -> {reg['current']:.0f}/s "
+                      f"({reg['change_pct']:+.1f}%)")
+        else:
+            print(f"   ✅ No regressions beyond {args.tolerance * 100:.0f}%")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    return status
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark the toolkit hot paths')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--ops', default=','.join(OPERATIONS),
+                        help='comma-separated operations to run')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='comma-separated trees to generate')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--inputs', help='extra process_files inputs as JSON')
+    parser.add_argument('--workdir', help='where to generate trees (kept afterwards)')
+    parser.add_argument('--skip-monitor', action='store_true')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='baseline JSON report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='allowed throughput drop before a case counts as a regression')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        case = json.loads(args.run_case)
+        runner = run_monitor_case if case['kind'] == 'monitor' else run_file_case
+        print(json.dumps(runner(case)))
+        return 0
+
+    unknown = set(args.ops.split(',')) - set(OPERATIONS) - {''}
+    unknown |= set(args.scenarios.split(',')) - set(SCENARIOS) - {''}
+    if unknown:
+        print(f"❌ Unknown operation/scenario: {', '.join(sorted(unknown))}")
+        return 1
+
+    return run_benchmarks(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
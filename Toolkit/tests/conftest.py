@@ -0,0 +1,19 @@
+import importlib.util
+import os
+import sys
+import pytest
+
+TOOLKIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tools import each other (and instrumentation) by module name, as they do
+# when the CLI runs them with tools/ on sys.path
+sys.path.insert(0, os.path.join(TOOLKIT_DIR, 'tools'))
+
+@pytest.fixture(scope='session')
+def cli():
+    """The automation-cli-tool.py module (its file name isn't importable as is)"""
+    spec = importlib.util.spec_from_file_location('automation_cli_tool',
+                                                  os.path.join(TOOLKIT_DIR, 'automation-cli-tool.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,70 @@
+import time
+from system_monitor import AlertLogWriter
+
+def read_lines(path):
+    return path.read_text().splitlines()
+
+def test_close_flushes_queued_lines(tmp_path):
+    path = tmp_path / 'alerts.log'
+    writer = AlertLogWriter(str(path), flush_interval=60)
+    writer.log('t1', 'CPU: 91.0%')
+    writer.log('t2', 'Disk: 71.0%')
+    
+    assert not path.exists()
+    writer.close()
+    
+    assert read_lines(path) == ['[t1] CPU: 91.0%', '[t2] Disk: 71.0%']
+
+def test_repeats_are_collapsed(tmp_path):
+    path = tmp_path / 'alerts.log'
+    writer = AlertLogWriter(str(path), flush_interval=60)
+    for i in range(4):
+        writer.log(f"t{i}", 'Disk: 71.0%')
+    writer.log('t4', 'CPU: 95.0%')
+    writer.log('t5', 'CPU: 95.0%')
+    writer.close()
+    
+    assert read_lines(path) == ['[t0] Disk: 71.0%',
+                                '[t3] Last message repeated 3 times',
+                                '[t4] CPU: 95.0%',
+                                '[t5] Last message repeated 1 time']
+
+def test_repeats_span_flushes(tmp_path):
+    path = tmp_path / 'alerts.log'
+    writer = AlertLogWriter(str(path), flush_interval=0.05)
+    writer.log('t0', 'Disk: 71.0%')
+    time.sleep(0.2)
+    assert read_lines(path) == ['[t0] Disk: 71.0%']
+    
+    writer.log('t1', 'Disk: 71.0%')
+    time.sleep(0.2)
+    writer.log('t2', 'Memory: 88.0%')
+    writer.close()
+    
+    assert read_lines(path) == ['[t0] Disk: 71.0%',
+                                '[t1] Last message repeated 1 time',
+                                '[t2] Memory: 88.0%']
+
+def test_rotates_by_size(tmp_path):
+    path = tmp_path / 'alerts.log'
+    writer = AlertLogWriter(str(path), flush_interval=0.01, max_bytes=40, backup_count=2)
+    for i in range(5):
+        writer.log(f"t{i}", f"alert number {i}")
+        time.sleep(0.05)
+    writer.close()
+    
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['alerts.log', 'alerts.log.1', 'alerts.log.2']
+    assert read_lines(path) == ['[t4] alert number 4']
+    assert read_lines(tmp_path / 'alerts.log.1') == ['[t2] alert number 2', '[t3] alert number 3']
+    assert read_lines(tmp_path / 'alerts.log.2') == ['[t0] alert number 0', '[t1] alert number 1']
+
+def test_rotates_by_age(tmp_path):
+    path = tmp_path / 'alerts.log'
+    writer = AlertLogWriter(str(path), flush_interval=0.01, rotate_seconds=0.1, backup_count=1)
+    writer.log('t0', 'first')
+    time.sleep(0.2)
+    writer.log('t1', 'second')
+    writer.close()
+    
+    assert read_lines(path) == ['[t1] second']
+    assert read_lines(tmp_path / 'alerts.log.1') == ['[t0] first']
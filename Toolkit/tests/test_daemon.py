@@ -0,0 +1,93 @@
+import os
+import socket
+import stat
+import threading
+import pytest
+
+def test_absolute_paths_resolves_declared_paths(cli, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tool = {'inputs': [{'name': 'source_folder', 'path': True}, {'name': 'pattern'}],
+            'path_settings': {'alert_log': 'alerts.log', 'history_file': None}}
+    
+    resolved = cli.absolute_paths(tool, {'source_folder': 'src', 'pattern': '*.txt',
+                                         'metrics_file': 'm.json'})
+    
+    assert resolved == {'source_folder': str(tmp_path / 'src'), 'pattern': '*.txt',
+                        'metrics_file': str(tmp_path / 'm.json'),
+                        'alert_log': str(tmp_path / 'alerts.log')}
+    assert cli.absolute_paths(tool, {'source_folder': '/data'})['source_folder'] == '/data'
+
+def test_tools_declare_their_path_inputs(cli):
+    toolkit = cli.AutomationToolkit(mode='inprocess')
+    paths = {tool['script']: sorted(c['name'] for c in tool['inputs'] if c.get('path'))
+             for tool in toolkit.tools.values() if os.path.exists(os.path.join(cli.TOOLS_DIR, tool['script']))}
+    
+    assert paths['file_processor.py'] == ['output_folder', 'source_folder']
+    assert paths['data_analyzer.py'] == ['data_file', 'output_folder']
+    assert paths['db_backup.py'] == ['backup_location', 'db_name']
+
+def test_database_names_are_only_paths_for_sqlite(cli, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    toolkit = cli.AutomationToolkit(mode='inprocess')
+    tool = next(tool for tool in toolkit.tools.values() if tool['script'] == 'db_backup.py')
+    
+    sqlite = cli.absolute_paths(tool, {'db_type': 'SQLite', 'db_name': 'app.db', 'backup_location': 'b'})
+    mysql = cli.absolute_paths(tool, {'db_type': 'mysql', 'db_name': 'shop', 'backup_location': 'b'})
+    
+    assert sqlite['db_name'] == str(tmp_path / 'app.db')
+    assert mysql['db_name'] == 'shop'
+    assert mysql['backup_location'] == str(tmp_path / 'b')
+
+def test_run_gate_gives_instrumented_runs_the_process(cli):
+    gate = cli.RunGate()
+    events = []
+    shared_started = threading.Event()
+    release_shared = threading.Event()
+    
+    def shared_run():
+        with gate.hold():
+            events.append('shared start')
+            shared_started.set()
+            release_shared.wait(5)
+            events.append('shared end')
+    
+    def exclusive_run():
+        with gate.hold(exclusive=True, on_wait=lambda: events.append('waiting')):
+            events.append('exclusive')
+    
+    first = threading.Thread(target=shared_run)
+    first.start()
+    shared_started.wait(5)
+    second = threading.Thread(target=exclusive_run)
+    second.start()
+    second.join(0.2)
+    release_shared.set()
+    for thread in (first, second):
+        thread.join(5)
+    
+    assert events == ['shared start', 'waiting', 'shared end', 'exclusive']
+
+def test_daemon_socket_is_private(cli, tmp_path):
+    socket_path = tmp_path / 'run' / 'daemon.sock'
+    daemon = cli.ToolDaemon(str(socket_path), idle_timeout=1)
+    try:
+        assert stat.S_IMODE(os.stat(socket_path.parent).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+        cli.connect_daemon(str(socket_path)).close()
+    finally:
+        daemon.server_close()
+
+def test_connect_refuses_shared_socket(cli, tmp_path):
+    shared = tmp_path / 'shared'
+    shared.mkdir(mode=0o755)
+    shared.chmod(0o755)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(shared / 'daemon.sock'))
+    listener.listen()
+    try:
+        with pytest.raises(PermissionError):
+            cli.connect_daemon(str(shared / 'daemon.sock'))
+        with pytest.raises(PermissionError):
+            cli.ToolDaemon(str(shared / 'other.sock'))
+    finally:
+        listener.close()
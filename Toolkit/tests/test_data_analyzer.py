@@ -0,0 +1,90 @@
+import json
+import random
+import statistics
+import pytest
+import data_analyzer
+
+@pytest.fixture(params=['python', 'numpy'])
+def engine(request, monkeypatch):
+    """Run each test on the pure-Python batches and, when installed, on NumPy"""
+    if request.param == 'numpy':
+        monkeypatch.setattr(data_analyzer, 'np', pytest.importorskip('numpy'))
+    else:
+        monkeypatch.setattr(data_analyzer, 'np', None)
+    return request.param
+
+def analyze(tmp_path, text, report_type, **inputs):
+    data_file = tmp_path / 'data.csv'
+    data_file.write_text(text)
+    assert data_analyzer.analyze_data(dict({
+        'data_file': str(data_file), 'report_type': report_type, 'output_format': 'json',
+        'include_charts': False, 'output_folder': str(tmp_path / 'reports'), 'chunk_rows': 7}, **inputs)) == 0
+    return json.loads((tmp_path / 'reports' / f"data_{report_type}.json").read_text())
+
+def column(report, name):
+    return next(c for c in report['columns'] if c['name'] == name)
+
+def test_moments_are_exact_across_batches(tmp_path, engine):
+    values = [random.Random(1).uniform(-50, 150) for _ in range(100)]
+    text = 'value,label\n' + ''.join(f"{v!r},{'ab'[i % 2]}\n" for i, v in enumerate(values))
+    
+    report = analyze(tmp_path, text, 'summary')
+    
+    stats = column(report, 'value')
+    assert report['engine'] == engine
+    assert (stats['type'], stats['count'], stats['missing']) == ('numeric', 100, 0)
+    assert stats['mean'] == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert stats['std'] == pytest.approx(statistics.stdev(values), rel=1e-12)
+    assert (stats['min'], stats['max']) == (min(values), max(values))
+    assert column(report, 'label')['type'] == 'text'
+    assert column(report, 'label')['top'] == [['a', 50], ['b', 50]]
+
+def test_missing_values_and_blank_lines(tmp_path, engine):
+    text = 'x,y\n1,a\n\nNA,b\n3,\n\n'
+    
+    report = analyze(tmp_path, text, 'summary')
+    
+    assert (report['rows'], report['malformed_rows']) == (3, 0)
+    x = column(report, 'x')
+    assert (x['count'], x['missing'], x['mean']) == (2, 1, 2.0)
+    assert column(report, 'y')['missing'] == 1
+
+def test_percentiles_and_group_by(tmp_path, engine):
+    rows = [(f"g{i % 3}", i) for i in range(1, 31)]
+    text = 'group,amount\n' + ''.join(f"{g},{v}\n" for g, v in rows)
+    
+    report = analyze(tmp_path, text, 'detailed', group_by='group')
+    
+    pcts = report['percentiles']['amount']
+    assert pcts['p50'] == pytest.approx(15.5)
+    assert pcts['p25'] == pytest.approx(8.25)
+    assert (pcts['p1'], pcts['p99']) == (pytest.approx(1.29), pytest.approx(29.71))
+    assert sum(report['histograms']['amount'][1]) == 30
+    
+    assert sorted(report['groups']) == ['g0', 'g1', 'g2']
+    g1 = report['groups']['g1']
+    assert g1['rows'] == 10
+    assert g1['amount'] == {'count': 10, 'mean': 14.5, 'min': 1, 'max': 28, 'sum': 145}
+    assert 'group' not in g1
+
+def test_trends_by_day_and_month(tmp_path, engine):
+    text = 'when,value\n' + ''.join(f"2024-01-{d:02d},{d}\n2024-01-{d:02d},{d + 10}\n" for d in range(1, 4))
+    
+    report = analyze(tmp_path, text, 'trends')
+    
+    assert (report['date_column'], report['trend_period']) == ('when', 'day')
+    assert list(report['trend']) == ['2024-01-01', '2024-01-02', '2024-01-03']
+    assert report['trend']['2024-01-02'] == {'rows': 2, 'value': {'count': 2, 'mean': 7.0, 'min': 2,
+                                                                   'max': 12, 'sum': 14}}
+
+def test_long_trends_roll_up_to_months(tmp_path, engine):
+    days = [f"{m:02d}/{d:02d}/2023" for m in range(1, 7) for d in range(1, 29)]
+    text = 'day,n\n' + ''.join(f"{day},{i}\n" for i, day in enumerate(days))
+    
+    report = analyze(tmp_path, text, 'trends')
+    
+    assert report['trend_period'] == 'month'
+    assert list(report['trend']) == [f"2023-{m:02d}" for m in range(1, 7)]
+    march = report['trend']['2023-03']
+    assert (march['rows'], march['n']['min'], march['n']['max']) == (28, 56, 83)
+    assert march['n']['mean'] == pytest.approx((56 + 83) / 2)
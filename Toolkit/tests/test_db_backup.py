@@ -0,0 +1,122 @@
+import glob
+import os
+import sqlite3
+import threading
+import time
+import pytest
+import db_backup
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / 'app.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)')
+    conn.executemany('INSERT INTO t (v) VALUES (?)', [(os.urandom(32).hex(),) for _ in range(5000)])
+    conn.commit()
+    conn.close()
+    return path
+
+def backup(database, location, **inputs):
+    return db_backup.backup_database(dict({'db_type': 'sqlite', 'db_name': str(database),
+                                           'backup_location': str(location), 'compress': False,
+                                           'chunk_size': 64 * 1024}, **inputs))
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT id, v FROM t ORDER BY id').fetchall()
+    finally:
+        conn.close()
+
+def latest(location, pattern):
+    return max(glob.glob(os.path.join(str(location), pattern)), key=os.path.getmtime)
+
+def restore(backup_path, target):
+    return db_backup.backup_database({'db_type': 'sqlite', 'db_name': backup_path,
+                                      'backup_location': str(target), 'compress': False, 'mode': 'restore'})
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_full_backup_round_trip(database, tmp_path, compress):
+    assert backup(database, tmp_path / 'out', compress=compress) == 0
+    
+    assert restore(latest(tmp_path / 'out', 'app_*.sqlite*'), tmp_path / 'restored.db') == 0
+    assert rows(tmp_path / 'restored.db') == rows(database)
+
+def test_incremental_round_trip_toggling_compress(database, tmp_path):
+    location = tmp_path / 'inc'
+    expected = []
+    for step, compress in enumerate((False, True, False, True)):
+        conn = sqlite3.connect(database)
+        conn.execute('UPDATE t SET v = ? WHERE id = ?', (f"step {step}", step + 1))
+        conn.commit()
+        conn.close()
+        assert backup(database, location, mode='incremental', compress=compress, codec='gzip') == 0
+        expected.append(rows(database))
+    
+    # Every manifest (all taken within a second or two) is kept and restorable
+    manifests = sorted(glob.glob(str(location / '*.manifest.json')), key=os.path.getmtime)
+    assert len(manifests) == 4
+    for step, manifest in enumerate(manifests):
+        target = tmp_path / f"restored_{step}.db"
+        assert restore(manifest, target) == 0
+        assert rows(target) == expected[step]
+
+def test_store_chunks_only_writes_changed_chunks(database, tmp_path):
+    store = str(tmp_path / 'store')
+    digests, new, _ = db_backup.store_chunks(str(database), store, 4096, codec='gzip')
+    assert new == len(set(digests))
+    
+    again, new, written = db_backup.store_chunks(str(database), store, 4096, codec='gzip')
+    assert (again, new, written) == (digests, 0, 0)
+    
+    # The same content under another codec is stored separately
+    _, new, _ = db_backup.store_chunks(str(database), store, 4096)
+    assert new == len(set(digests))
+
+def test_restore_rejects_corrupt_chunk(database, tmp_path):
+    assert backup(database, tmp_path / 'inc', mode='incremental') == 0
+    chunk = sorted(glob.glob(str(tmp_path / 'inc' / 'app.chunks' / '*' / '*')))[0]
+    with open(chunk, 'r+b') as f:
+        f.write(b'garbage')
+    
+    assert restore(latest(tmp_path / 'inc', '*.manifest.json'), tmp_path / 'restored.db') == 1
+    assert not (tmp_path / 'restored.db').exists()
+
+def test_snapshot_steps_stay_bounded_outside_wal():
+    assert -1 not in db_backup.snapshot_steps(8, wal=False)
+    assert max(db_backup.snapshot_steps(8, wal=False)) == 8 * 4 ** db_backup.MAX_RESTARTS
+    assert db_backup.snapshot_steps(8, wal=True)[-1] == -1
+
+@pytest.mark.parametrize('journal_mode', ['delete', 'wal'])
+def test_snapshot_under_steady_writer(database, tmp_path, journal_mode):
+    conn = sqlite3.connect(database)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.close()
+    stop = threading.Event()
+    
+    def writer():
+        conn = sqlite3.connect(database, timeout=30)
+        n = 0
+        while not stop.is_set():
+            n += 1
+            conn.execute('UPDATE t SET v = ? WHERE id = ?', (f"write {n}", n % 5000 + 1))
+            conn.commit()
+            time.sleep(0.002)
+        conn.close()
+    
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        result = backup(database, tmp_path / 'out', step_pages=1, step_pause=0.02)
+    finally:
+        stop.set()
+        thread.join()
+    
+    if journal_mode == 'wal':
+        # The last attempt copies in one step, which doesn't block a WAL writer
+        assert result == 0
+        assert restore(latest(tmp_path / 'out', 'app_*.sqlite'), tmp_path / 'restored.db') == 0
+    else:
+        # Rather than lock the writer out for a whole-database step, the backup gives up
+        assert result == 1
+        assert os.listdir(tmp_path / 'out') == []
@@ -0,0 +1,229 @@
+import json
+import os
+import shutil
+import pytest
+import file_processor
+
+def run(source, output, operation, **inputs):
+    return file_processor.process_files(dict({
+        'source_folder': str(source), 'output_folder': str(output), 'operation': operation,
+        'pattern': '*', 'recursive': False, 'report': 'quiet'}, **inputs))
+
+def test_convert_in_place_keeps_source(tmp_path):
+    (tmp_path / 'a.txt').write_text('hello world\n')
+    
+    assert run(tmp_path, tmp_path, 'convert') == 0
+    
+    assert (tmp_path / 'a.txt').read_text() == 'HELLO WORLD\n'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.txt']
+
+def test_stream_transform_splits_multibyte_chunks(tmp_path):
+    source = tmp_path / 'in.txt'
+    source.write_text('straße ü' * 100, encoding='utf-8')
+    
+    file_processor.stream_transform(str(source), str(tmp_path / 'out.txt'), chunk_size=7)
+    
+    assert (tmp_path / 'out.txt').read_text(encoding='utf-8') == ('straße ü' * 100).upper()
+
+def make_index(tmp_path, config='a', use_hash=False):
+    return file_processor.FileIndex(str(tmp_path / 'index.sqlite'), config, use_hash=use_hash)
+
+def indexed_pair(tmp_path):
+    source = tmp_path / 'src.txt'
+    output = tmp_path / 'out.txt'
+    source.write_text('data')
+    output.write_text('DATA')
+    index = make_index(tmp_path)
+    assert not index.is_unchanged(str(source))
+    index.record(str(source), str(output))
+    index.close()
+    return source, output
+
+def test_file_index_skips_recorded_file(tmp_path):
+    source, _ = indexed_pair(tmp_path)
+    
+    index = make_index(tmp_path)
+    assert index.is_unchanged(str(source))
+    assert not index.is_unchanged(str(source), force=True)
+    index.close()
+
+def test_file_index_detects_changes(tmp_path):
+    source, output = indexed_pair(tmp_path)
+    
+    assert not make_index(tmp_path, config='b').is_unchanged(str(source))
+    
+    st = output.stat()
+    output.write_text('XXXX')
+    os.utime(output, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert not make_index(tmp_path).is_unchanged(str(source))
+
+def test_file_index_source_modified(tmp_path):
+    source, _ = indexed_pair(tmp_path)
+    source.write_text('changed')
+    
+    assert not make_index(tmp_path).is_unchanged(str(source))
+
+def test_file_index_hash_ignores_touch(tmp_path):
+    source = tmp_path / 'src.txt'
+    output = tmp_path / 'out.txt'
+    source.write_text('data')
+    output.write_text('DATA')
+    index = make_index(tmp_path, use_hash=True)
+    index.is_unchanged(str(source))
+    index.record(str(source), str(output))
+    index.close()
+    
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert make_index(tmp_path, use_hash=True).is_unchanged(str(source))
+    assert not make_index(tmp_path).is_unchanged(str(source))
+
+def test_incremental_run_skips_unchanged(tmp_path, capsys):
+    source = tmp_path / 'src'
+    output = tmp_path / 'out'
+    source.mkdir()
+    for name in ('a.txt', 'b.txt'):
+        (source / name).write_text(name)
+    
+    assert run(source, output, 'convert', incremental=True, report='json') == 0
+    (source / 'b.txt').write_text('changed')
+    capsys.readouterr()
+    assert run(source, output, 'convert', incremental=True, report='json') == 0
+    
+    summary = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert (summary['processed'], summary['unchanged']) == (1, 1)
+    assert (output / 'b.txt').read_text() == 'CHANGED'
+
+def test_place_file_onto_itself_keeps_data(tmp_path):
+    source = tmp_path / 'b.dat'
+    source.write_bytes(b'\x00data')
+    
+    for mode in ('copy', 'reflink', 'symlink'):
+        with pytest.raises(shutil.SameFileError):
+            file_processor.place_file(str(source), str(source), mode)
+    assert file_processor.place_file(str(source), str(source), 'hardlink') == 'hardlink'
+    
+    assert source.read_bytes() == b'\x00data'
+    assert not source.is_symlink()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['b.dat']
+
+def test_place_file_existing_link_is_kept(tmp_path):
+    source = tmp_path / 'a.dat'
+    source.write_bytes(b'data')
+    
+    for mode in ('hardlink', 'symlink'):
+        output = tmp_path / f"{mode}.dat"
+        assert file_processor.place_file(str(source), str(output), mode) == mode
+        assert file_processor.place_file(str(source), str(output), mode) == mode
+        assert output.read_bytes() == b'data'
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['a.dat', 'hardlink.dat', 'symlink.dat']
+
+def test_convert_in_place_leaves_other_files_intact(tmp_path):
+    (tmp_path / 'b.dat').write_bytes(b'binary')
+    
+    run(tmp_path, tmp_path, 'convert')
+    
+    assert (tmp_path / 'b.dat').read_bytes() == b'binary'
+
+def test_dedup_counts_only_real_savings(tmp_path, capsys):
+    source = tmp_path / 'src'
+    for folder in ('x', 'y', 'z'):
+        (source / folder).mkdir(parents=True)
+    (source / 'b.jpg').write_bytes(b'photo')
+    (source / 'x' / 'a.jpg').write_bytes(b'photo')
+    (source / 'y' / 'a.jpg').write_bytes(b'photo')
+    (source / 'z' / 'b.jpg').write_bytes(b'photo')
+    
+    assert run(source, tmp_path / 'out', 'organize', recursive=True, dedup='hardlink', report='json') == 0
+    
+    summary = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert (summary['duplicates'], summary['same_name_duplicates'], summary['saved_bytes']) == (1, 2, 5)
+    assert (tmp_path / 'out' / 'jpg' / 'a.jpg').stat().st_ino == (tmp_path / 'out' / 'jpg' / 'b.jpg').stat().st_ino
+
+def test_process_pool_metrics_match_threads(tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    for i in range(20):
+        (source / f"{i}.txt").write_text('x' * i)
+    
+    metrics = {}
+    for executor in ('thread', 'process'):
+        metrics_file = tmp_path / f"{executor}.json"
+        run(source, tmp_path / executor, 'convert', workers=4, executor=executor,
+            metrics_file=str(metrics_file))
+        metrics[executor] = json.loads(metrics_file.read_text())
+    
+    for executor in ('thread', 'process'):
+        assert metrics[executor]['spans']['file']['calls'] == 20
+        assert metrics[executor]['counters']['files_ok'] == 20
+    assert metrics['process']['spans']['scan']['calls'] == metrics['thread']['spans']['scan']['calls']
+
+def test_parallel_convert_same_output_names(tmp_path, capsys):
+    source = tmp_path / 'src'
+    for i in range(200):
+        (source / f"d{i}").mkdir(parents=True)
+        (source / f"d{i}" / 'same.txt').write_text(f"file {i}\n" * 100)
+    
+    run(source, tmp_path / 'out', 'convert', recursive=True, workers=16, report='json')
+    
+    summary = json.loads(capsys.readouterr().out.splitlines()[-1])
+    assert (summary['processed'], summary['errors']) == (200, 0)
+    assert (tmp_path / 'out' / 'same.txt').read_text().startswith('FILE ')
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == ['same.txt']
+
+def test_copy_over_hardlinked_output_keeps_source(tmp_path):
+    source = tmp_path / 'src'
+    for folder, data in (('a', b'AAAA'), ('b', b'BBBB')):
+        (source / folder).mkdir(parents=True)
+        (source / folder / 'data.bin').write_bytes(data)
+    
+    for link_mode in ('hardlink', 'copy', 'reflink'):
+        run(source, tmp_path / 'out', 'rename', recursive=True, link_mode=link_mode)
+    
+    assert (source / 'a' / 'data.bin').read_bytes() == b'AAAA'
+    assert (source / 'b' / 'data.bin').read_bytes() == b'BBBB'
+    assert (tmp_path / 'out' / 'processed_data.bin').stat().st_nlink == 1
+
+def test_compress_over_hardlinked_output_keeps_source(tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'a.gz').write_bytes(b'not really gzip')
+    (source / 'a').write_bytes(b'plain')
+    
+    run(source, tmp_path / 'out', 'convert', pattern='a.gz', link_mode='hardlink')
+    run(source, tmp_path / 'out', 'compress', pattern='a')
+    
+    assert (source / 'a.gz').read_bytes() == b'not really gzip'
+    assert file_processor.gzip.decompress((tmp_path / 'out' / 'a.gz').read_bytes()) == b'plain'
+
+def test_dedup_rerun_after_duplicate_changes(tmp_path):
+    source = tmp_path / 'src'
+    output = tmp_path / 'out'
+    for folder in ('a', 'b'):
+        (source / folder).mkdir(parents=True)
+    (source / 'a' / 'x.txt').write_text('same')
+    (source / 'b' / 'y.txt').write_text('same')
+    
+    assert run(source, output, 'organize', recursive=True, dedup='hardlink') == 0
+    assert (output / 'txt' / 'x.txt').stat().st_ino == (output / 'txt' / 'y.txt').stat().st_ino
+    
+    (source / 'b' / 'y.txt').write_text('edited')
+    assert run(source, output, 'organize', recursive=True, dedup='hardlink') == 0
+    
+    for path in (source / 'a' / 'x.txt', source / 'b' / 'y.txt'):
+        assert (output / 'txt' / path.name).read_text() == path.read_text()
+    assert (source / 'a' / 'x.txt').read_text() == 'same'
+
+def test_failed_files_make_the_run_fail(tmp_path):
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'a.txt').write_text('a')
+    (source / 'b.txt').write_text('b')
+    (tmp_path / 'out' / 'a.txt').mkdir(parents=True)
+    
+    assert run(source, tmp_path / 'out', 'convert') == 1
+    assert (tmp_path / 'out' / 'b.txt').read_text() == 'B'
+    
+    (tmp_path / 'out' / 'a.txt').rmdir()
+    assert run(source, tmp_path / 'out', 'convert') == 0
+    assert (tmp_path / 'out' / 'a.txt').read_text() == 'A'
@@ -0,0 +1,40 @@
+import builtins
+
+def file_processor_tool(cli):
+    toolkit = cli.AutomationToolkit(mode='inprocess')
+    return toolkit, next(tool for tool in toolkit.tools.values() if tool['script'] == 'file_processor.py')
+
+def collect(toolkit, tool, answers, monkeypatch):
+    prompts = []
+    replies = iter(answers)
+    
+    def fake_input(prompt):
+        prompts.append(prompt)
+        return next(replies)
+    
+    monkeypatch.setattr(builtins, 'input', fake_input)
+    return toolkit.collect_inputs(tool), prompts
+
+def test_incremental_and_force_are_prompted(cli, monkeypatch, capsys):
+    toolkit, tool = file_processor_tool(cli)
+    
+    inputs, prompts = collect(toolkit, tool, ['src', 'out', 'Convert', '*.txt', 'y', '', '',
+                                              'hardlink', 'y', 'y', '', 'json'], monkeypatch)
+    
+    assert len(prompts) == 12
+    assert (inputs['link_mode'], inputs['incremental'], inputs['force'], inputs['hash'],
+            inputs['report']) == ('hardlink', True, True, False, 'json')
+    assert (inputs['codec'], inputs['level'], inputs['dedup']) == ('gzip', 6, 'off')
+
+def test_irrelevant_prompts_use_defaults(cli, monkeypatch, capsys):
+    toolkit, tool = file_processor_tool(cli)
+    
+    inputs, prompts = collect(toolkit, tool, ['src', 'out', 'compress', '*', 'n', '4', '',
+                                              'bz2', '9', '', ''], monkeypatch)
+    
+    assert len(prompts) == 11
+    assert (inputs['codec'], inputs['level'], inputs['workers']) == ('bz2', 9, 4)
+    assert (inputs['link_mode'], inputs['incremental'], inputs['force']) == ('copy', False, False)
+    
+    _, errors = toolkit.validate_inputs(tool, inputs)
+    assert errors == []
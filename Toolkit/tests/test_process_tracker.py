@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+from system_monitor import ProcessTracker
+
+def test_sample_reports_live_processes():
+    tracker = ProcessTracker()
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        tracker.sample()
+        rows = {row[0]: row for row in tracker.sample()}
+    finally:
+        child.kill()
+        child.wait()
+    
+    assert os.getpid() in rows and child.pid in rows
+    assert rows[os.getpid()][3] > 0
+    assert tracker.scans == 2 and tracker.processes >= len(rows)
+    assert child.pid not in {row[0] for row in tracker.sample()}
+
+def test_top_orders_by_column():
+    rows = [(1, 'a', 5.0, 1.0), (2, 'b', 50.0, 0.5), (3, 'c', 0.0, 9.0)]
+    
+    assert [row[0] for row in ProcessTracker.top(rows, 2)] == [2, 1]
+    assert [row[0] for row in ProcessTracker.top(rows, 1, by='memory')] == [3]
@@ -0,0 +1,110 @@
+import json
+import pytest
+
+TOOL = {'name': 'File Batch Processor', 'script': 'file_processor.py', 'cache': True,
+        'inputs': [{'name': 'source_folder', 'type': 'str', 'fingerprint': True},
+                   {'name': 'operation', 'type': 'str'}]}
+RESULT = {'returncode': 0, 'timed_out': False, 'cancelled': False,
+          'stdout_tail': ['done'], 'stderr_tail': [], 'execution_time': 1.5}
+
+@pytest.fixture
+def cache(cli, tmp_path):
+    cache = cli.ResultCache(str(tmp_path / 'cache.sqlite'))
+    yield cache
+    cache.conn.close()
+
+@pytest.fixture
+def source(tmp_path):
+    folder = tmp_path / 'src'
+    folder.mkdir()
+    (folder / 'a.txt').write_text('a')
+    return folder
+
+def test_hit_has_full_result_shape(cache, source):
+    inputs = {'source_folder': str(source), 'operation': 'convert'}
+    assert cache.lookup(TOOL, inputs) is None
+    
+    cache.store(TOOL, inputs, RESULT)
+    
+    assert cache.lookup(TOOL, inputs) == dict(RESULT, cached=True)
+    assert cache.lookup(TOOL, dict(inputs, operation='compress')) is None
+
+def test_changed_tree_misses(cache, source):
+    inputs = {'source_folder': str(source), 'operation': 'convert'}
+    cache.store(TOOL, inputs, RESULT)
+    
+    (source / 'b.txt').write_text('b')
+    
+    assert cache.lookup(TOOL, inputs) is None
+
+def test_failed_runs_are_not_stored(cache, source):
+    inputs = {'source_folder': str(source), 'operation': 'convert'}
+    for failure in ({'returncode': 1}, {'timed_out': True}, {'cancelled': True}):
+        cache.store(TOOL, inputs, dict(RESULT, **failure))
+    
+    assert cache.lookup(TOOL, inputs) is None
+
+def test_uncacheable_tool(cache, source):
+    cache.store(dict(TOOL, cache=False), {'source_folder': str(source)}, RESULT)
+    
+    assert cache.lookup(dict(TOOL, cache=False), {'source_folder': str(source)}) is None
+
+def test_repeat_batch_uses_cache(cli, cache, source, tmp_path):
+    job_file = tmp_path / 'jobs.json'
+    job_file.write_text(json.dumps([{'tool': 'file_processor.py', 'inputs': {
+        'source_folder': str(source), 'output_folder': str(tmp_path / 'out'),
+        'operation': 'convert', 'pattern': '*.txt', 'recursive': False}}]))
+    toolkit = cli.AutomationToolkit(mode='subprocess', cache=cache)
+    
+    reports = []
+    for run in ('first', 'second'):
+        report_file = tmp_path / f"{run}.json"
+        assert toolkit.run_batch(str(job_file), 1, str(report_file)) == 0
+        reports.append(json.loads(report_file.read_text())['jobs'][0])
+    
+    assert [(job['status'], job['cached']) for job in reports] == [('ok', False), ('ok', True)]
+    assert (tmp_path / 'out' / 'a.txt').read_text() == 'A'
+
+def test_run_with_file_errors_is_not_replayed(cli, cache, source, tmp_path):
+    job_file = tmp_path / 'jobs.json'
+    job_file.write_text(json.dumps([{'tool': 'file_processor.py', 'inputs': {
+        'source_folder': str(source), 'output_folder': str(tmp_path / 'out'),
+        'operation': 'convert', 'pattern': '*.txt', 'recursive': False}}]))
+    toolkit = cli.AutomationToolkit(mode='subprocess', cache=cache)
+    (tmp_path / 'out' / 'a.txt').mkdir(parents=True)
+    
+    assert toolkit.run_batch(str(job_file), 1, str(tmp_path / 'first.json')) != 0
+    (tmp_path / 'out' / 'a.txt').rmdir()
+    assert toolkit.run_batch(str(job_file), 1, str(tmp_path / 'second.json')) == 0
+    
+    assert json.loads((tmp_path / 'second.json').read_text())['jobs'][0]['cached'] is False
+    assert (tmp_path / 'out' / 'a.txt').read_text() == 'A'
+
+def test_large_trees_are_not_cached(cli, tmp_path, source):
+    (source / 'b.txt').write_text('b')
+    inputs = {'source_folder': str(source), 'operation': 'convert'}
+    
+    small = cli.ResultCache(str(tmp_path / 'small.sqlite'), max_files=1)
+    small.store(TOOL, inputs, RESULT)
+    assert small.lookup(TOOL, inputs) is None
+    
+    unlimited = cli.ResultCache(str(tmp_path / 'unlimited.sqlite'), max_files=0)
+    unlimited.store(TOOL, inputs, RESULT)
+    assert unlimited.lookup(TOOL, inputs) is not None
+    
+    # A tree that grows past the limit after it was cached stops hitting
+    unlimited.max_files = 1
+    assert unlimited.lookup(TOOL, inputs) is None
+
+def test_fingerprint_sees_directories(cli, tmp_path):
+    folder = tmp_path / 'out'
+    folder.mkdir()
+    (folder / 'b.txt').write_text('b')
+    before = cli.fingerprint_path(str(folder))
+    
+    (folder / 'a.txt').mkdir()
+    with_dir = cli.fingerprint_path(str(folder))
+    (folder / 'a.txt').rmdir()
+    
+    assert with_dir != before
+    assert cli.fingerprint_path(str(folder)) == before
@@ -0,0 +1,85 @@
+import threading
+import pytest
+from system_monitor import RingBuffer, TimeSeriesStore
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(4, 'd')
+    for value in range(1, 7):
+        ring.append(value)
+    
+    assert len(ring) == 4
+    assert list(ring.values()) == [3, 4, 5, 6]
+    assert list(ring.values(2)) == [5, 6]
+    assert (ring[0], ring[-1]) == (3, 6)
+    assert ring.bisect(4.5) == 2
+
+def test_window_and_stats_after_wraparound():
+    store = TimeSeriesStore(raw_capacity=5, rollups={60: 4})
+    for t in range(10):
+        store.add('cpu', float(t), timestamp=1000.0 + t)
+    
+    assert list(store.window('cpu')) == [5, 6, 7, 8, 9]
+    assert list(store.window('cpu', seconds=2)) == [7, 8, 9]
+    assert store.stats('cpu', seconds=2) == {'count': 3, 'min': 7, 'avg': 8, 'max': 9}
+    assert store.percentile('cpu', 50) == 7
+    assert store.percentile('cpu', 90) == pytest.approx(8.6)
+    assert store.stats('memory') == {'count': 0, 'min': None, 'avg': None, 'max': None}
+
+def test_rollups_aggregate_and_wrap():
+    store = TimeSeriesStore(raw_capacity=10, rollups={60: 3})
+    for minute in range(5):
+        for second, value in ((0, 10.0), (30, 30.0)):
+            store.add('cpu', value + minute, timestamp=minute * 60 + second)
+    
+    rollup = store.rollup('cpu', 60)
+    assert [bucket[0] for bucket in rollup] == [120, 180, 240]
+    assert rollup[-1] == (240, 14, 24, 34, 2)
+    assert store.rollup('cpu', 60, seconds=60) == rollup[-2:]
+    assert store.rollup('cpu', 300) == []
+
+def test_save_and_load_round_trip(tmp_path):
+    store = TimeSeriesStore(raw_capacity=4, rollups={60: 2, 300: 2})
+    for t in range(7):
+        store.add_sample({'cpu': t * 1.5, 'disk': 70.0 + t}, timestamp=t * 50.0)
+    path = tmp_path / 'history.bin'
+    
+    store.save(str(path))
+    loaded = TimeSeriesStore.load(str(path))
+    
+    for metric in ('cpu', 'disk'):
+        assert list(loaded.window(metric)) == list(store.window(metric))
+        for resolution in (60, 300):
+            assert loaded.rollup(metric, resolution) == store.rollup(metric, resolution)
+    loaded.add('cpu', 99.0, timestamp=400.0)
+    assert loaded.window('cpu')[-1] == 99.0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['history.bin']
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'nope')
+    
+    with pytest.raises(ValueError):
+        TimeSeriesStore.load(str(path))
+
+def test_concurrent_saves_to_one_file(tmp_path):
+    path = str(tmp_path / 'history.bin')
+    errors = []
+    
+    def monitor(offset):
+        store = TimeSeriesStore(raw_capacity=500)
+        for t in range(500):
+            store.add('cpu', float(t + offset), timestamp=float(t))
+        try:
+            for _ in range(20):
+                store.save(path)
+        except OSError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=monitor, args=(i * 1000,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(TimeSeriesStore.load(path).window('cpu')) == 500
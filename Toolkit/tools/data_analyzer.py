@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+Data Report Generator Tool
+Summarize CSV data into HTML and JSON reports
+"""
+
+import csv
+import html
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import datetime
+from instrumentation import instruments, instrumented
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python batches (array-backed) are used instead
+    np = None
+
+TOOL_INFO = {
+    'id': 2,
+    'name': 'Data Report Generator',
+    'description': 'Generate reports from CSV data',
+    'entry': 'analyze_data',
+    'cache': True,
+    'inputs': [
+        {'name': 'data_file', 'prompt': 'Enter data file path: ', 'type': 'str', 'path': True, 'fingerprint': True},
+        {'name': 'report_type', 'prompt': 'Report type (summary/detailed/trends): ', 'type': 'str'},
+        {'name': 'output_format', 'prompt': 'Output format (HTML/JSON, Enter = HTML): ', 'type': 'str', 'default': 'html'},
+        {'name': 'include_charts', 'prompt': 'Include charts? (y/n): ', 'type': 'bool'},
+        {'name': 'output_folder', 'prompt': 'Output folder (Enter = reports): ', 'type': 'str', 'default': 'reports', 'path': True, 'fingerprint': True}
+    ]
+}
+
+REPORT_TYPES = ('summary', 'detailed', 'trends')
+OUTPUT_FORMATS = ('html', 'json')
+CHUNK_ROWS = 50000  # Rows parsed and aggregated per batch
+MISSING_VALUES = frozenset(['', 'na', 'n/a', 'nan', 'null', 'none', '-'])
+NUMERIC_TOLERANCE = 0.01  # Share of unparsable values a numeric column may have
+RESERVOIR_SIZE = 20000  # Values sampled per numeric column for percentiles/histograms
+MAX_CATEGORIES = 1000  # Distinct values counted exactly per column
+MAX_GROUPS = 500  # Group-by keys tracked before the rest go to "(other)"
+MAX_TREND_DAYS = 5000  # Daily buckets tracked for trends
+MAX_TREND_POINTS = 120  # More periods than this are rolled up to months
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+HISTOGRAM_BINS = 20
+TOP_VALUES = 10
+OTHER_GROUP = '(other)'
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+DATE_FORMATS = ('%Y/%m/%d', '%m/%d/%Y', '%d.%m.%Y', '%d-%m-%Y')
+
+def parse_float(value):
+    """float(value), or NaN for missing and non-numeric values"""
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+def to_floats(values):
+    """Parse a column batch into a float vector aligned with values (NaN = no number).
+    
+    With NumPy a clean batch is converted in one call; batches with gaps or
+    text fall back to a per-value parse into the same vector type.
+    """
+    if np is not None:
+        try:
+            return np.array(values, dtype=np.float64)
+        except ValueError:
+            return np.fromiter((parse_float(v) for v in values), np.float64, len(values))
+    return array('d', (parse_float(v) for v in values))
+
+def batch_moments(vector):
+    """(n, mean, m2, min, max) of the non-NaN values in a vector"""
+    if np is not None:
+        x = vector[~np.isnan(vector)]
+        if not len(x):
+            return 0, 0.0, 0.0, math.inf, -math.inf
+        mean = x.mean()
+        return len(x), float(mean), float(((x - mean) ** 2).sum()), float(x.min()), float(x.max())
+    
+    x = [v for v in vector if v == v]
+    if not x:
+        return 0, 0.0, 0.0, math.inf, -math.inf
+    mean = math.fsum(x) / len(x)
+    return len(x), mean, math.fsum((v - mean) ** 2 for v in x), min(x), max(x)
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted sequence"""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+class ColumnStats:
+    """Streaming statistics for one column.
+    
+    Moments are merged batch by batch (Chan et al.), so mean and standard
+    deviation are exact in one pass. Percentiles and histograms come from
+    a fixed-size reservoir sample, which is exact for columns with at most
+    RESERVOIR_SIZE values. Value counts are exact up to MAX_CATEGORIES
+    distinct values; past that the rarest are folded into other_count, so
+    top values stay approximately right. Memory per column is bounded
+    whatever the file size.
+    """
+    
+    def __init__(self, name, rng):
+        self.name = name
+        self.rng = rng
+        self.count = 0  # Present (non-missing) values
+        self.missing = 0
+        self.non_numeric = 0
+        self.parse_numbers = True
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.seen = 0  # Numbers offered to the reservoir
+        self.sample = array('d')
+        self.categories = Counter()
+        self.other_count = 0
+        self.categories_capped = False
+    
+    @property
+    def numeric(self):
+        return self.n > 0 and self.non_numeric <= self.count * NUMERIC_TOLERANCE
+    
+    def update(self, values):
+        """Fold in a batch of raw values; returns the aligned float vector (or None)"""
+        present = [v for v in values if v.lower() not in MISSING_VALUES]
+        self.missing += len(values) - len(present)
+        self.count += len(present)
+        self.add_categories(present)
+        
+        if not self.parse_numbers:
+            return None
+        vector = to_floats(values)
+        n, mean, m2, low, high = batch_moments(vector)
+        self.non_numeric += len(present) - n
+        if n:
+            self.merge_moments(n, mean, m2, low, high)
+            self.add_to_reservoir(vector)
+        # Once a column can no longer qualify as numeric, stop parsing it
+        if self.count >= 1000 and self.non_numeric > self.count * NUMERIC_TOLERANCE:
+            self.parse_numbers = False
+        return vector
+    
+    def merge_moments(self, n, mean, m2, low, high):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+    
+    def add_to_reservoir(self, vector):
+        """Reservoir sampling (algorithm R) of this batch's numbers"""
+        if np is not None:
+            x = vector[~np.isnan(vector)]
+            room = RESERVOIR_SIZE - len(self.sample)
+            if room > 0:
+                self.sample.extend(x[:room].tolist())
+                self.seen += min(room, len(x))
+                x = x[room:]
+            if len(x):
+                slots = self.rng.integers(0, self.seen + np.arange(1, len(x) + 1))
+                keep = slots < RESERVOIR_SIZE
+                reservoir = np.frombuffer(self.sample, dtype=np.float64)
+                reservoir[slots[keep]] = x[keep]
+                self.seen += len(x)
+            return
+        
+        for v in vector:
+            if v != v:
+                continue
+            self.seen += 1
+            if len(self.sample) < RESERVOIR_SIZE:
+                self.sample.append(v)
+            else:
+                slot = self.rng.randrange(self.seen)
+                if slot < RESERVOIR_SIZE:
+                    self.sample[slot] = v
+    
+    def add_categories(self, present):
+        self.categories.update(present)
+        if len(self.categories) > MAX_CATEGORIES * 2:
+            self.categories_capped = True
+            kept = self.categories.most_common(MAX_CATEGORIES)
+            self.other_count += sum(self.categories.values()) - sum(c for _, c in kept)
+            self.categories = Counter(dict(kept))
+    
+    def summary(self):
+        info = {'name': self.name, 'type': 'numeric' if self.numeric else 'text',
+                'count': self.count, 'missing': self.missing,
+                'distinct': f">{MAX_CATEGORIES}" if self.categories_capped else len(self.categories)}
+        if self.numeric:
+            info.update(min=self.min, max=self.max, mean=self.mean,
+                        std=math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0,
+                        sum=self.mean * self.n, non_numeric=self.non_numeric)
+        else:
+            info['top'] = self.categories.most_common(TOP_VALUES)
+        return info
+    
+    def percentiles(self):
+        ordered = sorted(self.sample)
+        return {f"p{p}": percentile(ordered, p) for p in PERCENTILES}
+    
+    def histogram(self, bins=HISTOGRAM_BINS):
+        """(edges, counts) over the reservoir sample"""
+        if not self.sample:
+            return [], []
+        low, high = min(self.sample), max(self.sample)
+        width = (high - low) / bins or 1.0
+        counts = [0] * bins
+        for v in self.sample:
+            counts[min(int((v - low) / width), bins - 1)] += 1
+        return [low + width * i for i in range(bins + 1)], counts
+
+class GroupStats:
+    """Per-key count/sum/min/max of numeric columns, updated batch by batch.
+    
+    Used for group-by aggregates and, keyed by date bucket, for trends. At
+    most max_groups keys are tracked; later keys are aggregated under
+    OTHER_GROUP so memory stays bounded.
+    """
+    
+    def __init__(self, max_groups=MAX_GROUPS):
+        self.max_groups = max_groups
+        self.codes = {}  # key -> group index
+        self.rows = []  # Rows per group
+        self.columns = {}  # column -> [counts, sums, mins, maxs], one slot per group
+    
+    def code(self, key):
+        code = self.codes.get(key)
+        if code is None:
+            if len(self.codes) >= self.max_groups:
+                key = OTHER_GROUP
+                code = self.codes.get(key)
+            if code is None:
+                code = self.codes[key] = len(self.rows)
+                self.rows.append(0)
+                for slots in self.columns.values():
+                    slots[0].append(0)
+                    slots[1].append(0.0)
+                    slots[2].append(math.inf)
+                    slots[3].append(-math.inf)
+        return code
+    
+    def update(self, keys, vectors):
+        """Aggregate one batch: keys[i] is row i's group (None = skip the row)"""
+        codes = [None if key is None else self.code(key) for key in keys]
+        for code in codes:
+            if code is not None:
+                self.rows[code] += 1
+        if np is not None:
+            all_idx = np.array([-1 if c is None else c for c in codes], dtype=np.int64)
+        
+        for name, vector in vectors.items():
+            slots = self.columns.get(name)
+            if slots is None:
+                size = len(self.rows)
+                slots = self.columns[name] = [[0] * size, [0.0] * size,
+                                              [math.inf] * size, [-math.inf] * size]
+            counts, sums, mins, maxs = slots
+            
+            if np is not None:
+                mask = (all_idx >= 0) & ~np.isnan(vector)
+                idx, x = all_idx[mask], vector[mask]
+                size = len(self.rows)
+                batch_counts = np.bincount(idx, minlength=size)
+                batch_sums = np.bincount(idx, weights=x, minlength=size)
+                batch_mins = np.full(size, np.inf)
+                batch_maxs = np.full(size, -np.inf)
+                np.minimum.at(batch_mins, idx, x)
+                np.maximum.at(batch_maxs, idx, x)
+                for g in np.flatnonzero(batch_counts):
+                    counts[g] += int(batch_counts[g])
+                    sums[g] += float(batch_sums[g])
+                    mins[g] = min(mins[g], float(batch_mins[g]))
+                    maxs[g] = max(maxs[g], float(batch_maxs[g]))
+                continue
+            
+            for code, v in zip(codes, vector):
+                if code is None or v != v:
+                    continue
+                counts[code] += 1
+                sums[code] += v
+                if v < mins[code]:
+                    mins[code] = v
+                if v > maxs[code]:
+                    maxs[code] = v
+    
+    def results(self, columns):
+        """{key: {'rows': n, column: {count, mean, min, max}}} for the given columns"""
+        out = {}
+        for key, code in self.codes.items():
+            entry = {'rows': self.rows[code]}
+            for name in columns:
+                counts, sums, mins, maxs = self.columns.get(name, ([0], [0.0], [0.0], [0.0]))
+                if code < len(counts) and counts[code]:
+                    entry[name] = {'count': counts[code], 'mean': sums[code] / counts[code],
+                                   'min': mins[code], 'max': maxs[code], 'sum': sums[code]}
+            out[key] = entry
+        return out
+
+def date_parser(samples):
+    """Return a function mapping a raw value to 'YYYY-MM-DD' (or None) that
+    fits every sample, or None if the samples aren't dates"""
+    if not samples:
+        return None
+    if all(ISO_DATE.match(v) for v in samples):
+        return lambda v: v[:10] if ISO_DATE.match(v) else None
+    for fmt in DATE_FORMATS:
+        try:
+            for v in samples:
+                datetime.strptime(v, fmt)
+        except ValueError:
+            continue
+        def parse(v, fmt=fmt):
+            try:
+                return datetime.strptime(v, fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                return None
+        return parse
+    return None
+
+def detect_date_column(header, rows):
+    """First column whose leading values all parse as dates, with its parser"""
+    for i, name in enumerate(header):
+        samples = [row[i].strip() for row in rows[:50] if row[i].strip().lower() not in MISSING_VALUES]
+        parser = date_parser(samples[:20])
+        if parser:
+            return i, parser
+    return None, None
+
+def roll_up_months(trend):
+    """Merge daily trend buckets into months"""
+    months = {}
+    for day, entry in trend.items():
+        month = months.setdefault(day[:7], {'rows': 0})
+        month['rows'] += entry['rows']
+        for name, agg in entry.items():
+            if name == 'rows':
+                continue
+            into = month.get(name)
+            if into is None:
+                month[name] = dict(agg)
+            else:
+                into['count'] += agg['count']
+                into['sum'] += agg['sum']
+                into['min'] = min(into['min'], agg['min'])
+                into['max'] = max(into['max'], agg['max'])
+                into['mean'] = into['sum'] / into['count']
+    return months
+
+def iter_chunks(reader, width, chunk_rows, stats):
+    """Yield lists of rows normalized to the header width.
+    
+    Blank lines (which csv.reader returns as []) are dropped rather than
+    padded into rows of missing values.
+    """
+    while True:
+        rows = list(itertools.islice(reader, chunk_rows))
+        if not rows:
+            return
+        rows = [row for row in rows if row]
+        for i, row in enumerate(rows):
+            if len(row) != width:
+                stats['malformed'] += 1
+                rows[i] = (row + [''] * width)[:width]
+        if rows:
+            yield rows
+
+def format_number(value):
+    if value is None or (isinstance(value, float) and not math.isfinite(value)):
+        return '-'
+    if isinstance(value, float):
+        if value != 0 and (abs(value) >= 1e9 or abs(value) < 1e-3):
+            return f"{value:.4g}"
+        return f"{value:,.3f}".rstrip('0').rstrip('.')
+    return f"{value:,}" if isinstance(value, int) else str(value)
+
+def svg_bars(values, labels, width=420, height=120):
+    """Inline SVG bar chart"""
+    if not values:
+        return ''
+    peak = max(values) or 1
+    bar = width / len(values)
+    parts = [f'<svg class="chart" width="{width}" height="{height}" viewBox="0 0 {width} {height}">']
+    for i, (value, label) in enumerate(zip(values, labels)):
+        h = value / peak * (height - 4)
+        parts.append(f'<rect x="{i * bar + 1:.1f}" y="{height - h:.1f}" width="{max(bar - 2, 1):.1f}" '
+                     f'height="{h:.1f}"><title>{html.escape(str(label))}: {format_number(value)}</title></rect>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def svg_line(values, labels, width=420, height=120):
+    """Inline SVG line chart (None values are skipped)"""
+    points = [(i, v) for i, v in enumerate(values) if v is not None]
+    if len(points) < 2:
+        return ''
+    low = min(v for _, v in points)
+    high = max(v for _, v in points)
+    span = (high - low) or 1
+    step = width / (len(values) - 1)
+    coords = ' '.join(f"{i * step:.1f},{height - 4 - (v - low) / span * (height - 8):.1f}" for i, v in points)
+    return (f'<svg class="chart" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+            f'<polyline fill="none" stroke="#3a6ea5" stroke-width="2" points="{coords}"/>'
+            f'<title>{html.escape(str(labels[0]))} to {html.escape(str(labels[-1]))}</title></svg>')
+
+HTML_STYLE = """
+body { font-family: -apple-system, Segoe UI, sans-serif; margin: 2em; color: #222; }
+h1 { font-size: 1.5em; } h2 { font-size: 1.2em; margin-top: 2em; }
+table { border-collapse: collapse; margin: 0.5em 0; font-size: 0.9em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+th { background: #f0f3f7; }
+.chart rect { fill: #3a6ea5; } .chart { display: block; margin: 0.5em 0 1.5em; }
+.meta { color: #666; }
+"""
+
+def html_table(headers, rows):
+    parts = ['<table><tr>' + ''.join(f'<th>{html.escape(str(h))}</th>' for h in headers) + '</tr>']
+    for row in rows:
+        parts.append('<tr>' + ''.join(f'<td>{html.escape(format_number(c))}</td>' for c in row) + '</tr>')
+    parts.append('</table>')
+    return '\n'.join(parts)
+
+def render_html(report, include_charts):
+    """Render the report dict as a standalone HTML page"""
+    columns = report['columns']
+    numeric = [c for c in columns if c['type'] == 'numeric']
+    text = [c for c in columns if c['type'] == 'text']
+    out = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(report['title'])}</title>",
+           f"<style>{HTML_STYLE}</style></head><body>",
+           f"<h1>{html.escape(report['title'])}</h1>",
+           f"<p class='meta'>{html.escape(report['source'])} &middot; {report['rows']:,} rows &middot; "
+           f"{len(columns)} columns &middot; generated {html.escape(report['generated'])}</p>"]
+    
+    if numeric:
+        out.append('<h2>Numeric columns</h2>')
+        out.append(html_table(['Column', 'Count', 'Missing', 'Min', 'Mean', 'Std', 'Max', 'Sum'],
+                              [[c['name'], c['count'], c['missing'], c['min'], c['mean'], c['std'],
+                                c['max'], c['sum']] for c in numeric]))
+    if text:
+        out.append('<h2>Text columns</h2>')
+        out.append(html_table(['Column', 'Count', 'Missing', 'Distinct', 'Most common'],
+                              [[c['name'], c['count'], c['missing'], c['distinct'],
+                                ', '.join(f"{v} ({n:,})" for v, n in c['top'][:3])] for c in text]))
+    
+    if report.get('percentiles'):
+        out.append('<h2>Percentiles</h2>')
+        labels = [f"p{p}" for p in PERCENTILES]
+        out.append(html_table(['Column'] + labels,
+                              [[name] + [pcts[label] for label in labels]
+                               for name, pcts in report['percentiles'].items()]))
+    if include_charts and report.get('histograms'):
+        out.append('<h2>Distributions</h2>')
+        for name, (edges, counts) in report['histograms'].items():
+            out.append(f"<h3>{html.escape(name)}</h3>")
+            out.append(svg_bars(counts, [f"{format_number(edges[i])} - {format_number(edges[i + 1])}"
+                                         for i in range(len(counts))]))
+    
+    for name, top in report.get('top_values', {}).items():
+        out.append(f"<h2>Top values: {html.escape(name)}</h2>")
+        out.append(html_table(['Value', 'Rows'], top))
+        if include_charts:
+            out.append(svg_bars([n for _, n in top], [v for v, _ in top]))
+    
+    if report.get('groups'):
+        key = report['group_by']
+        names = [c['name'] for c in numeric if c['name'] != key]
+        ordered = sorted(report['groups'].items(), key=lambda item: item[1]['rows'], reverse=True)[:50]
+        out.append(f"<h2>By {html.escape(key)} (mean)</h2>")
+        out.append(html_table([key, 'Rows'] + names,
+                              [[group, entry['rows']] + [entry.get(n, {}).get('mean') for n in names]
+                               for group, entry in ordered]))
+    
+    if report.get('trend'):
+        names = [c['name'] for c in numeric]
+        periods = list(report['trend'])
+        out.append(f"<h2>Trends by {report['trend_period']} ({html.escape(report['date_column'])})</h2>")
+        out.append(html_table(['Period', 'Rows'] + [f"{n} (mean)" for n in names],
+                              [[p, report['trend'][p]['rows']] + [report['trend'][p].get(n, {}).get('mean')
+                                                                  for n in names] for p in periods]))
+        if include_charts:
+            out.append(f"<h3>Rows per {report['trend_period']}</h3>")
+            out.append(svg_bars([report['trend'][p]['rows'] for p in periods], periods))
+            for n in names:
+                out.append(f"<h3>{html.escape(n)} (mean)</h3>")
+                out.append(svg_line([report['trend'][p].get(n, {}).get('mean') for p in periods], periods))
+    
+    out.append('</body></html>')
+    return '\n'.join(out)
+
+@instrumented('data_analyzer')
+def analyze_data(inputs):
+    """Main data analysis logic"""
+    data_file = inputs['data_file']
+    report_type = inputs['report_type'].lower()
+    output_format = (inputs.get('output_format') or 'html').lower()
+    include_charts = inputs.get('include_charts', False)
+    output_folder = inputs.get('output_folder') or 'reports'
+    chunk_rows = int(inputs.get('chunk_rows', CHUNK_ROWS))
+    
+    if report_type not in REPORT_TYPES:
+        print(f"❌ Unknown report type: {report_type} (use {'/'.join(REPORT_TYPES)})")
+        return 1
+    if output_format not in OUTPUT_FORMATS:
+        print(f"⚠️  {output_format.upper()} output isn't supported; writing HTML and JSON")
+        output_format = 'html'
+    if not os.path.isfile(data_file):
+        print(f"❌ Data file doesn't exist: {data_file}")
+        return 1
+    if data_file.lower().endswith(('.xls', '.xlsx')):
+        print("❌ Excel files aren't supported; export the sheet as CSV first")
+        return 1
+    
+    file_size = os.path.getsize(data_file)
+    print(f"📊 Analyzing: {data_file} ({file_size / (1024 * 1024):.1f} MB)")
+    print(f"📋 Report: {report_type}")
+    print(f"🧮 Engine: {'NumPy' if np is not None else 'pure Python'}, {chunk_rows:,} rows per batch")
+    print("-" * 50)
+    
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(0) if np is not None else random.Random(0)
+    stats = {'malformed': 0}
+    
+    with open(data_file, 'r', newline='', encoding=inputs.get('encoding', 'utf-8'), errors='replace') as f:
+        try:
+            dialect = csv.Sniffer().sniff(f.read(64 * 1024), delimiters=',;\t|')
+        except csv.Error:
+            dialect = csv.excel
+        f.seek(0)
+        reader = csv.reader(f, dialect)
+        header = next((row for row in reader if row), None)
+        if not header:
+            print("❌ Data file is empty")
+            return 1
+        header = [name.strip() or f"column_{i + 1}" for i, name in enumerate(header)]
+        columns = [ColumnStats(name, rng) for name in header]
+        
+        groups = trend = None
+        group_index = date_index = parse_date = None
+        row_count = 0
+        
+        for rows in instruments.timed('read', iter_chunks(reader, len(header), chunk_rows, stats)):
+            if row_count == 0:
+                # Pick the group-by and date columns from the first batch
+                if report_type == 'detailed' and inputs.get('group_by'):
+                    if inputs['group_by'] not in header:
+                        print(f"❌ Unknown group_by column: {inputs['group_by']}")
+                        return 1
+                    group_index = header.index(inputs['group_by'])
+                    groups = GroupStats()
+                if report_type == 'trends':
+                    if inputs.get('date_column'):
+                        if inputs['date_column'] not in header:
+                            print(f"❌ Unknown date column: {inputs['date_column']}")
+                            return 1
+                        date_index = header.index(inputs['date_column'])
+                        samples = [row[date_index].strip() for row in rows[:50]
+                                   if row[date_index].strip().lower() not in MISSING_VALUES]
+                        parse_date = date_parser(samples[:20])
+                    else:
+                        date_index, parse_date = detect_date_column(header, rows)
+                    if parse_date is None:
+                        print("❌ No date column found for trends (set the date_column input)")
+                        return 1
+                    trend = GroupStats(MAX_TREND_DAYS)
+            
+            row_count += len(rows)
+            with instruments.span('aggregate'):
+                vectors = {}
+                for i, column in enumerate(columns):
+                    vector = column.update([row[i].strip() for row in rows])
+                    if vector is not None and i not in (group_index, date_index):
+                        vectors[column.name] = vector
+                if groups is not None:
+                    groups.update([row[group_index].strip() for row in rows], vectors)
+                if trend is not None:
+                    trend.update([parse_date(row[date_index].strip()) for row in rows], vectors)
+            
+            if row_count % (chunk_rows * 10) == 0:
+                print(f"   ⏳ {row_count:,} rows...", flush=True)
+    
+    instruments.count('rows', row_count)
+    instruments.count('bytes_in', file_size)
+    
+    with instruments.span('report'):
+        report = {
+            'title': f"{report_type.capitalize()} report: {os.path.basename(data_file)}",
+            'source': os.path.abspath(data_file),
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'report_type': report_type,
+            'engine': 'numpy' if np is not None else 'python',
+            'rows': row_count,
+            'malformed_rows': stats['malformed'],
+            'columns': [c.summary() for c in columns],
+        }
+        numeric = [c for c in columns if c.numeric]
+        numeric_names = [c.name for c in numeric]
+        if report_type == 'detailed':
+            report['percentiles'] = {c.name: c.percentiles() for c in numeric}
+            report['histograms'] = {c.name: c.histogram() for c in numeric}
+            report['top_values'] = {c.name: c.categories.most_common(TOP_VALUES)
+                                    for c in columns if not c.numeric and c.count}
+            if groups is not None:
+                report['group_by'] = header[group_index]
+                report['groups'] = groups.results(numeric_names)
+        if trend is not None:
+            daily = dict(sorted(trend.results(numeric_names).items()))
+            report['date_column'] = header[date_index]
+            report['trend_period'] = 'day'
+            if len(daily) > MAX_TREND_POINTS:
+                daily = dict(sorted(roll_up_months(daily).items()))
+                report['trend_period'] = 'month'
+            report['trend'] = daily
+        
+        os.makedirs(output_folder, exist_ok=True)
+        stem = os.path.join(output_folder, f"{os.path.splitext(os.path.basename(data_file))[0]}_{report_type}")
+        outputs = [stem + '.json']
+        with open(stem + '.json', 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        if output_format == 'html':
+            outputs.append(stem + '.html')
+            with open(stem + '.html', 'w', encoding='utf-8') as f:
+                f.write(render_html(report, include_charts))
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"📈 Columns: {len(columns)} ({len(numeric)} numeric)")
+    for c in report['columns'][:20]:
+        if c['type'] == 'numeric':
+            print(f"   🔢 {c['name']}: min {format_number(c['min'])}, mean {format_number(c['mean'])}, "
+                  f"max {format_number(c['max'])}, missing {c['missing']:,}")
+        else:
+            top = c['top'][0][0] if c['top'] else '-'
+            print(f"   🔤 {c['name']}: {c['distinct']} distinct, top '{top}', missing {c['missing']:,}")
+    if len(columns) > 20:
+        print(f"   ... and {len(columns) - 20} more columns")
+    
+    print("-" * 50)
+    print(f"📊 Analysis Summary:")
+    print(f"   📄 Rows: {row_count:,}")
+    if stats['malformed']:
+        print(f"   ⚠️  Malformed rows (padded/truncated): {stats['malformed']:,}")
+    if report.get('groups'):
+        print(f"   🗂️  Groups by {report['group_by']}: {len(report['groups'])}")
+    if report.get('trend'):
+        print(f"   📅 Trend periods ({report['trend_period']}): {len(report['trend'])}")
+    speed = file_size / (1024 * 1024) / elapsed if elapsed > 0 else 0
+    print(f"   🚀 Throughput: {speed:.1f} MB/s, {row_count / elapsed if elapsed > 0 else 0:,.0f} rows/s")
+    for path in outputs:
+        print(f"   📁 Report: {path}")
+    
+    return 0
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 2:
+        print("❌ No input provided")
+        return 1
+    
+    try:
+        inputs = json.loads(sys.argv[1])
+        return analyze_data(inputs)
+    except json.JSONDecodeError:
+        print("❌ Invalid input format")
+        return 1
+    except Exception as e:
+        print(f"💥 Unexpected error: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
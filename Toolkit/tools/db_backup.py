@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Database Backup Tool
+Back up databases online, compressed and optionally incrementally
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from file_processor import COMPRESSION_CODECS, DEFAULT_COMPRESSION_LEVEL, compress_file, format_size, temp_path
+from instrumentation import instruments, instrumented
+
+TOOL_INFO = {
+    'id': 5,
+    'name': 'Database Backup',
+    'description': 'Backup databases with compression',
+    'entry': 'backup_database',
+    'timeout': None,  # Multi-GB databases take as long as they take
+    'inputs': [
+        {'name': 'db_type', 'prompt': 'Database type (mysql/postgres/sqlite): ', 'type': 'str'},
+        # A file for sqlite backups and restores; mysql/postgres take a database name
+        {'name': 'db_name', 'prompt': 'Database name: ', 'type': 'str', 'path': {'db_type': 'sqlite'}},
+        {'name': 'backup_location', 'prompt': 'Backup location: ', 'type': 'str', 'path': True},
+        {'name': 'compress', 'prompt': 'Compress backup? (y/n): ', 'type': 'bool'},
+        {'name': 'mode', 'prompt': 'Mode (full/incremental/restore, Enter = full): ', 'type': 'str', 'default': 'full'}
+    ]
+}
+
+BACKUP_MODES = ('full', 'incremental', 'restore')
+STEP_PAGES = 1024  # Pages copied per backup step; the source is unlocked in between
+STEP_PAUSE = 0.005  # Seconds to yield to writers between steps
+MAX_RESTARTS = 3  # Restarts, each with a 4x larger step, before giving up (or, in WAL mode, copying in one step)
+BACKUP_CHUNK_SIZE = 1024 * 1024  # Incremental chunk size (rounded to whole pages)
+MANIFEST_SUFFIX = '.manifest.json'
+
+class SnapshotRestarted(Exception):
+    """The source database changed often enough to keep restarting the backup"""
+
+def snapshot_steps(step_pages, wal):
+    """Pages per backup step for each attempt, in order.
+    
+    Every retry uses a step four times larger. Only in WAL mode, where a
+    read transaction doesn't block writers, does the last attempt copy
+    everything in one step (-1); in rollback-journal mode that step would
+    lock writers out for the whole copy, so steps stay bounded.
+    """
+    steps = [step_pages * 4 ** attempt for attempt in range(MAX_RESTARTS + 1)]
+    if wal:
+        steps[-1] = -1
+    return steps
+
+def snapshot_sqlite(db_path, target_path, step_pages=STEP_PAGES, pause=STEP_PAUSE):
+    """Copy a live SQLite database to target_path with the online backup API.
+    
+    Pages are copied step_pages at a time and the source is released
+    between steps, so writers are only held off for one step at a time.
+    SQLite restarts a backup whenever another connection writes to the
+    source, so each restart retries with a larger step (see snapshot_steps).
+    Raises SnapshotRestarted if a rollback-journal database never stays
+    still long enough. Returns the database's (page_size, page_count).
+    """
+    source = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    state = {'last_remaining': None, 'next_report': 0.1}
+    
+    def progress(status, remaining, total):
+        # A step that succeeded without reducing the remaining pages was restarted
+        # (restarted after every step, the count just stays put)
+        if (status == sqlite3.SQLITE_OK and state['last_remaining'] is not None
+                and remaining >= state['last_remaining']):
+            raise SnapshotRestarted()
+        state['last_remaining'] = remaining
+        done = (total - remaining) / total if total else 1
+        if done >= state['next_report']:
+            print(f"   ⏳ Snapshot {done * 100:.0f}% ({total - remaining:,}/{total:,} pages)", flush=True)
+            state['next_report'] = done + 0.1
+        if remaining and pause:
+            time.sleep(pause)
+    
+    try:
+        page_size = source.execute('PRAGMA page_size').fetchone()[0]
+        wal = source.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal'
+        steps = snapshot_steps(step_pages, wal)
+        target = sqlite3.connect(target_path)
+        try:
+            with instruments.span('snapshot'):
+                for attempt, pages in enumerate(steps):
+                    state['last_remaining'] = None
+                    try:
+                        source.backup(target, pages=pages, progress=progress)
+                        break
+                    except SnapshotRestarted:
+                        instruments.count('restarts')
+                        if attempt + 1 == len(steps):
+                            raise
+                        next_pages = steps[attempt + 1]
+                        next_step = 'one step' if next_pages < 0 else f"steps of {next_pages:,} pages"
+                        print(f"   ⚠️  Source changed during the snapshot; restarting in {next_step}")
+            page_count = target.execute('PRAGMA page_count').fetchone()[0]
+        finally:
+            target.close()
+    finally:
+        source.close()
+    
+    instruments.count('pages', page_count)
+    return page_size, page_count
+
+def chunk_path(store, digest, codec=None):
+    """Where a chunk lives; the codec's extension keeps raw and compressed copies apart"""
+    extension = COMPRESSION_CODECS[codec]['extension'] if codec else ''
+    return os.path.join(store, digest[:2], digest + extension)
+
+def store_chunks(snapshot_path, store, chunk_size, codec=None, level=DEFAULT_COMPRESSION_LEVEL, threads=1):
+    """Split a snapshot into content-addressed chunks, writing only new ones.
+    
+    Each chunk is stored once per codec under its BLAKE2b hash, so a backup
+    costs only the chunks that changed since any earlier backup in the same
+    store with the same codec. New chunks are compressed on a thread pool
+    with a bounded window. Returns (digests, new_chunks, bytes_written).
+    """
+    compress = COMPRESSION_CODECS[codec]['compress'] if codec else None
+    digests = []
+    new_chunks = 0
+    written = 0
+    pending = deque()
+    queued = set()
+    
+    def write_chunk(digest, data):
+        path = chunk_path(store, digest, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = compress(data, level) if compress else data
+        tmp_path = temp_path(path)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return len(data)
+    
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as pool, open(snapshot_path, 'rb') as src:
+        while True:
+            with instruments.span('read'):
+                data = src.read(chunk_size)
+            if not data:
+                break
+            with instruments.span('hash'):
+                digest = hashlib.blake2b(data, digest_size=20).hexdigest()
+            digests.append(digest)
+            if digest in queued or os.path.exists(chunk_path(store, digest, codec)):
+                continue
+            queued.add(digest)
+            new_chunks += 1
+            pending.append(pool.submit(write_chunk, digest, data))
+            if len(pending) >= max(1, threads) * 2:
+                written += pending.popleft().result()
+        with instruments.span('compress'):
+            while pending:
+                written += pending.popleft().result()
+    
+    instruments.count('chunks', len(digests))
+    instruments.count('chunks_new', new_chunks)
+    return digests, new_chunks, written
+
+def restore_backup(backup_path, target_path):
+    """Rebuild a database file from a full backup or an incremental manifest.
+    
+    Returns the number of bytes restored.
+    """
+    if os.path.exists(target_path):
+        raise FileExistsError(f"Refusing to overwrite existing file: {target_path}")
+    tmp_path = temp_path(target_path)
+    restored = 0
+    
+    try:
+        with open(tmp_path, 'wb') as dst:
+            if backup_path.endswith(MANIFEST_SUFFIX):
+                with open(backup_path, 'r') as f:
+                    manifest = json.load(f)
+                store = os.path.join(os.path.dirname(os.path.abspath(backup_path)), manifest['store'])
+                codec = manifest.get('codec')
+                for digest in manifest['chunks']:
+                    with open(chunk_path(store, digest, codec), 'rb') as f:
+                        data = f.read()
+                    if codec:
+                        data = COMPRESSION_CODECS[codec]['decompress'](data)
+                    if hashlib.blake2b(data, digest_size=20).hexdigest() != digest:
+                        raise ValueError(f"Chunk {digest} is corrupt")
+                    dst.write(data)
+                    restored += len(data)
+            else:
+                codec = next((name for name, spec in COMPRESSION_CODECS.items()
+                              if backup_path.endswith(spec['extension'])), None)
+                opener = COMPRESSION_CODECS[codec]['read'] if codec else lambda path: open(path, 'rb')
+                with opener(backup_path) as src:
+                    while True:
+                        data = src.read(BACKUP_CHUNK_SIZE)
+                        if not data:
+                            break
+                        dst.write(data)
+                        restored += len(data)
+        
+        check = sqlite3.connect(tmp_path)
+        try:
+            result = check.execute('PRAGMA quick_check').fetchone()[0]
+        finally:
+            check.close()
+        if result != 'ok':
+            raise ValueError(f"Restored database failed integrity check: {result}")
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return restored
+
+def backup_sqlite(inputs):
+    """Online backup of a SQLite database file"""
+    db_path = inputs['db_name']
+    backup_location = inputs['backup_location']
+    mode = inputs.get('mode', 'full').lower()
+    codec = inputs.get('codec', 'gzip').lower() if inputs.get('compress') else None
+    level = inputs.get('level', DEFAULT_COMPRESSION_LEVEL)
+    threads = int(inputs.get('compress_threads', 1))
+    
+    if codec and codec not in COMPRESSION_CODECS:
+        print(f"❌ Unknown codec: {codec} (use {'/'.join(COMPRESSION_CODECS)})")
+        return 1
+    if not os.path.isfile(db_path):
+        print(f"❌ Database file doesn't exist: {db_path}")
+        return 1
+    
+    os.makedirs(backup_location, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    stamp = base_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # Backups taken within the same second get -1, -2, ... instead of overwriting each other
+    existing = os.listdir(backup_location)
+    copies = 0
+    while any(name.startswith(f"{stem}_{stamp}.") for name in existing):
+        copies += 1
+        stamp = f"{base_stamp}-{copies}"
+    # The backup API writes to a database, so the snapshot is staged next to the output
+    snapshot = os.path.join(backup_location, f".{stem}_{stamp}.snapshot{os.getpid()}")
+    start_time = time.perf_counter()
+    
+    try:
+        try:
+            page_size, page_count = snapshot_sqlite(db_path, snapshot,
+                                                    int(inputs.get('step_pages', STEP_PAGES)),
+                                                    float(inputs.get('step_pause', STEP_PAUSE)))
+        except SnapshotRestarted:
+            print(f"❌ The database kept changing during the snapshot ({MAX_RESTARTS + 1} attempts). "
+                  f"Retry when it is quieter, raise step_pages, or switch it to WAL mode "
+                  f"(PRAGMA journal_mode=WAL), where the snapshot doesn't block writers")
+            return 1
+        size = os.path.getsize(snapshot)
+        instruments.count('bytes_in', size)
+        print(f"   📸 Snapshot: {page_count:,} pages of {page_size} bytes ({format_size(size)})")
+        
+        if mode == 'incremental':
+            chunk_size = int(inputs.get('chunk_size', BACKUP_CHUNK_SIZE))
+            chunk_size = max(page_size, chunk_size // page_size * page_size)
+            store_name = f"{stem}.chunks"
+            digests, new_chunks, written = store_chunks(
+                snapshot, os.path.join(backup_location, store_name), chunk_size, codec, level, threads)
+            output = os.path.join(backup_location, f"{stem}_{stamp}{MANIFEST_SUFFIX}")
+            manifest = {'created': datetime.now().isoformat(timespec='seconds'),
+                        'source': os.path.abspath(db_path), 'page_size': page_size,
+                        'size': size, 'chunk_size': chunk_size, 'codec': codec,
+                        'store': store_name, 'chunks': digests}
+            with open(output, 'w') as f:
+                json.dump(manifest, f)
+            detail = (f"{new_chunks} of {len(digests)} chunks new, "
+                      f"{format_size(written)} written ({written / size * 100 if size else 0:.1f}% of the database)")
+        elif codec:
+            output = os.path.join(backup_location, f"{stem}_{stamp}.sqlite{COMPRESSION_CODECS[codec]['extension']}")
+            with instruments.span('compress'):
+                _, written = compress_file(snapshot, output, codec=codec, level=level, threads=threads)
+            detail = f"{format_size(size)} -> {format_size(written)} ({written / size * 100 if size else 0:.0f}%)"
+        else:
+            output = os.path.join(backup_location, f"{stem}_{stamp}.sqlite")
+            os.replace(snapshot, output)
+            written = size
+            detail = format_size(size)
+    finally:
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+    
+    instruments.count('bytes_out', written)
+    elapsed = time.perf_counter() - start_time
+    speed = size / (1024 * 1024) / elapsed if elapsed > 0 else 0
+    print("-" * 50)
+    print(f"📊 Backup Summary:")
+    print(f"   💾 Output: {output}")
+    print(f"   📦 {detail}")
+    print(f"   🚀 {speed:.1f} MB/s over {elapsed:.2f} seconds")
+    return 0
+
+def backup_unsupported(inputs):
+    """Placeholder for database types whose dump tooling isn't wired up yet"""
+    print(f"❌ {inputs['db_type']} backups aren't implemented yet; "
+          f"add one with register_backend('{inputs['db_type']}', func)")
+    return 1
+
+# Backup implementations by db_type. Each takes the tool inputs and returns
+# an exit code; mysql/postgres would wrap mysqldump/pg_dump output.
+BACKENDS = {
+    'sqlite': backup_sqlite,
+    'mysql': backup_unsupported,
+    'postgres': backup_unsupported,
+}
+
+def register_backend(db_type, func):
+    """Make a backup implementation available for db_type"""
+    BACKENDS[db_type] = func
+
+@instrumented('db_backup')
+def backup_database(inputs):
+    """Main backup logic"""
+    db_type = inputs['db_type'].lower()
+    mode = inputs.get('mode', 'full').lower()
+    
+    if mode not in BACKUP_MODES:
+        print(f"❌ Unknown mode: {mode} (use {'/'.join(BACKUP_MODES)})")
+        return 1
+    if db_type not in BACKENDS:
+        print(f"❌ Unknown database type: {db_type} (use {'/'.join(BACKENDS)})")
+        return 1
+    
+    if mode == 'restore':
+        # db_name is the backup (archive or manifest), backup_location the new database file
+        print(f"♻️  Restoring {inputs['db_name']} -> {inputs['backup_location']}")
+        try:
+            with instruments.span('restore'):
+                restored = restore_backup(inputs['db_name'], inputs['backup_location'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Restore failed: {e}")
+            return 1
+        print(f"✅ Restored {format_size(restored)}, integrity check passed")
+        return 0
+    
+    print(f"🗄️  Backing up {db_type} database: {inputs['db_name']}")
+    print(f"📁 Location: {inputs['backup_location']}")
+    print(f"🔄 Mode: {mode}")
+    print(f"🗜️  Compress: {'Yes' if inputs.get('compress') else 'No'}")
+    print("-" * 50)
+    return BACKENDS[db_type](inputs)
+
+def main():
+    """Main entry point"""
+    if len(sys.argv) < 2:
+        print("❌ No input provided")
+        return 1
+    
+    try:
+        inputs = json.loads(sys.argv[1])
+        return backup_database(inputs)
+    except json.JSONDecodeError:
+        print("❌ Invalid input format")
+        return 1
+    except Exception as e:
+        print(f"💥 Unexpected error: {str(e)}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,13 +4,916 @@ File Batch Processor Tool
 Processes multiple files with various operations
 """
 
+import bz2
+import codecs
+import errno
+import fnmatch
+import gzip
+import hashlib
 import json
+import lzma
+import mmap
 import sys
 import os
-import glob
+import re
+import time
 import shutil
+import sqlite3
+import threading
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                as_completed, wait, FIRST_COMPLETED)
+from collections import deque
 from pathlib import Path
+from instrumentation import instruments, instrumented, reset_worker
 
+TOOL_INFO = {
+    'id': 1,
+    'name': 'File Batch Processor',
+    'description': 'Process multiple files with custom operations',
+    'entry': 'process_files',
+    'timeout': None,  # Large trees legitimately take hours
+    'cache': True,
+    'inputs': [
+        {'name': 'source_folder', 'prompt': 'Enter source folder path: ', 'type': 'str', 'path': True, 'fingerprint': True},
+        {'name': 'output_folder', 'prompt': 'Enter output folder path: ', 'type': 'str', 'path': True, 'fingerprint': True},
+        {'name': 'operation', 'prompt': 'Operation (rename/convert/compress/organize): ', 'type': 'str'},
+        {'name': 'pattern', 'prompt': 'File pattern (e.g., *.txt): ', 'type': 'str'},
+        {'name': 'recursive', 'prompt': 'Include subfolders? (y/n): ', 'type': 'bool'},
+        {'name': 'workers', 'prompt': 'Parallel workers (Enter = 1, 0 = auto): ', 'type': 'int', 'default': 1},
+        {'name': 'executor', 'prompt': 'Executor (thread/process, Enter = thread): ', 'type': 'str', 'default': 'thread'},
+        {'name': 'codec', 'prompt': 'Codec (gzip/bz2/lzma, Enter = gzip): ', 'type': 'str', 'default': 'gzip',
+         'when': {'operation': 'compress'}},
+        {'name': 'level', 'prompt': 'Compression level (Enter = 6): ', 'type': 'int', 'default': 6,
+         'when': {'operation': 'compress'}},
+        {'name': 'link_mode', 'prompt': 'Place files by (copy/hardlink/symlink/reflink, Enter = copy): ', 'type': 'str',
+         'default': 'copy', 'when': {'operation': ['rename', 'convert', 'organize']}},
+        {'name': 'dedup', 'prompt': 'Duplicates (off/skip/hardlink, Enter = off): ', 'type': 'str', 'default': 'off',
+         'when': {'operation': 'organize'}},
+        {'name': 'incremental', 'prompt': 'Skip files unchanged since the last run? (y/n, Enter = n): ', 'type': 'bool',
+         'default': False},
+        {'name': 'force', 'prompt': 'Force a full run anyway? (y/n, Enter = n): ', 'type': 'bool', 'default': False,
+         'when': {'incremental': True}},
+        {'name': 'hash', 'prompt': 'Compare contents by hash? (y/n, Enter = n): ', 'type': 'bool', 'default': False,
+         'when': {'incremental': True}},
+        {'name': 'report', 'prompt': 'Report (verbose/progress/quiet/json, Enter = verbose): ', 'type': 'str',
+         'default': 'verbose'}
+    ]
+}
+
+DEFAULT_EXECUTOR = 'thread'
+PROCESS_BATCH_SIZE = 64
+CHUNK_SIZE = 1024 * 1024  # 1 MiB per read/transform/write step
+MMAP_THRESHOLD = 256 * 1024 * 1024  # Files at least this big are read via mmap
+
+# Text transforms usable by the streaming path. Each one maps a str chunk to
+# a str chunk and must not depend on text outside the chunk it is given.
+TEXT_TRANSFORMS = {
+    'upper': str.upper,
+    'lower': str.lower,
+    'swapcase': str.swapcase,
+}
+
+def register_transform(name, func):
+    """Make a chunk-wise text transform available to stream_transform"""
+    TEXT_TRANSFORMS[name] = func
+
+def temp_path(path):
+    """A staging name next to path that no other thread or process is using"""
+    return f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+
+def iter_chunks(src, chunk_size, use_mmap):
+    """Yield raw byte chunks from an open binary file"""
+    if use_mmap:
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, len(mm), chunk_size):
+                yield mm[offset:offset + chunk_size]
+        return
+    
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def stream_transform(input_path, output_path, transform='upper', encoding='utf-8',
+                     chunk_size=CHUNK_SIZE, mmap_threshold=MMAP_THRESHOLD):
+    """Apply a text transform to a file in bounded memory.
+    
+    Bytes are decoded incrementally, so multi-byte sequences split across
+    chunk boundaries are carried over to the next chunk instead of failing.
+    Output goes to a temporary file that replaces output_path at the end,
+    so converting a file in place never truncates the input before it is
+    read. Time spent reading, transforming and writing is recorded as spans.
+    Returns (bytes_in, bytes_out).
+    """
+    func = TEXT_TRANSFORMS[transform] if isinstance(transform, str) else transform
+    decoder = codecs.getincrementaldecoder(encoding)()
+    encoder = codecs.getincrementalencoder(encoding)()
+    bytes_in = 0
+    bytes_out = 0
+    read_time = transform_time = write_time = 0.0
+    tmp_path = temp_path(output_path)
+    
+    try:
+        with open(input_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            size = os.fstat(src.fileno()).st_size
+            use_mmap = mmap_threshold is not None and 0 < size and size >= mmap_threshold
+            
+            mark = time.perf_counter()
+            for chunk in iter_chunks(src, chunk_size, use_mmap):
+                read_done = time.perf_counter()
+                bytes_in += len(chunk)
+                data = encoder.encode(func(decoder.decode(chunk)))
+                transform_done = time.perf_counter()
+                dst.write(data)
+                bytes_out += len(data)
+                mark_next = time.perf_counter()
+                read_time += read_done - mark
+                transform_time += transform_done - read_done
+                write_time += mark_next - transform_done
+                mark = mark_next
+            
+            # Flush any trailing partial sequence (raises on truncated input)
+            data = encoder.encode(func(decoder.decode(b'', final=True)), final=True)
+            dst.write(data)
+            bytes_out += len(data)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    instruments.add_time('read', read_time)
+    instruments.add_time('transform', transform_time)
+    instruments.add_time('write', write_time)
+    return bytes_in, bytes_out
+
+# Compression codecs. Every codec's decompressor accepts concatenated streams,
+# so independently compressed blocks can simply be written back to back.
+COMPRESSION_CODECS = {
+    'gzip': {
+        'extension': '.gz',
+        'levels': range(0, 10),
+        'open': lambda path, level: gzip.open(path, 'wb', compresslevel=level),
+        'compress': lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+        'decompress': gzip.decompress,
+        'read': lambda path: gzip.open(path, 'rb'),
+    },
+    'bz2': {
+        'extension': '.bz2',
+        'levels': range(1, 10),
+        'open': lambda path, level: bz2.open(path, 'wb', compresslevel=level),
+        'compress': lambda data, level: bz2.compress(data, compresslevel=level),
+        'decompress': bz2.decompress,
+        'read': lambda path: bz2.open(path, 'rb'),
+    },
+    'lzma': {
+        'extension': '.xz',
+        'levels': range(0, 10),
+        'open': lambda path, level: lzma.open(path, 'wb', preset=level),
+        'compress': lambda data, level: lzma.compress(data, preset=level),
+        'decompress': lzma.decompress,
+        'read': lambda path: lzma.open(path, 'rb'),
+    },
+}
+DEFAULT_COMPRESSION_LEVEL = 6
+COMPRESS_BLOCK_SIZE = 1024 * 1024  # Block size for parallel compression
+PARALLEL_COMPRESS_MIN_SIZE = 8 * 1024 * 1024  # Smaller files are compressed in one stream
+
+def compress_file(input_path, output_path, codec='gzip', level=DEFAULT_COMPRESSION_LEVEL,
+                  threads=1, block_size=COMPRESS_BLOCK_SIZE):
+    """Compress a file, optionally splitting it into blocks compressed in parallel.
+    
+    The parallel mode works like pigz: each block becomes its own complete
+    stream and the streams are concatenated in order, which every stdlib
+    decompressor (and gzip/bzip2/xz on the command line) reads as one file.
+    zlib, bz2 and lzma release the GIL while compressing, so a thread pool
+    keeps several cores busy without pickling blocks between processes.
+    Reading is recorded as the 'read' span and everything else (compressing,
+    waiting on blocks, writing) as 'compress'. Returns (bytes_in, bytes_out).
+    """
+    spec = COMPRESSION_CODECS[codec]
+    bytes_in = 0
+    read_time = 0.0
+    start = time.perf_counter()
+    # Staged like stream_transform, so an existing output that is a link is replaced
+    tmp_path = temp_path(output_path)
+    
+    try:
+        with open(input_path, 'rb') as src:
+            size = os.fstat(src.fileno()).st_size
+            
+            if threads <= 1 or size < PARALLEL_COMPRESS_MIN_SIZE:
+                with spec['open'](tmp_path, level) as dst:
+                    mark = time.perf_counter()
+                    for chunk in iter_chunks(src, CHUNK_SIZE, use_mmap=False):
+                        read_time += time.perf_counter() - mark
+                        dst.write(chunk)
+                        bytes_in += len(chunk)
+                        mark = time.perf_counter()
+            else:
+                # Keep a bounded window of blocks in flight and write them in order
+                pending = deque()
+                with ThreadPoolExecutor(max_workers=threads) as pool, open(tmp_path, 'wb') as dst:
+                    mark = time.perf_counter()
+                    for block in iter_chunks(src, block_size, use_mmap=False):
+                        read_time += time.perf_counter() - mark
+                        bytes_in += len(block)
+                        pending.append(pool.submit(spec['compress'], block, level))
+                        if len(pending) >= threads * 2:
+                            dst.write(pending.popleft().result())
+                        mark = time.perf_counter()
+                    while pending:
+                        dst.write(pending.popleft().result())
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    instruments.add_time('read', read_time)
+    instruments.add_time('compress', time.perf_counter() - start - read_time)
+    return bytes_in, os.path.getsize(output_path)
+
+def format_size(num_bytes):
+    """Human readable byte count"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+LINK_MODES = ('copy', 'hardlink', 'symlink', 'reflink')
+FICLONE = 0x40049409  # Linux ioctl that clones a file's extents (btrfs, XFS, ...)
+# errnos meaning "this fast path isn't available here", so try the next one
+FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                   errno.ENOTSUP, errno.EBADF, errno.EPERM, errno.ENOTTY}
+_fast_copy = {'copy_file_range': hasattr(os, 'copy_file_range'),
+              'sendfile': hasattr(os, 'sendfile')}
+
+def _kernel_copy(func, src_fd, dst_fd, size):
+    """Drive copy_file_range/sendfile until the whole file is copied"""
+    offset = 0
+    while offset < size:
+        if func == 'copy_file_range':
+            sent = os.copy_file_range(src_fd, dst_fd, min(size - offset, 1 << 30))
+        else:
+            sent = os.sendfile(dst_fd, src_fd, offset, min(size - offset, 1 << 30))
+        if sent == 0:
+            break
+        offset += sent
+
+def _reflink(file_path, output_path):
+    import fcntl
+    with open(file_path, 'rb') as src, open(output_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+def copy_data(file_path, output_path):
+    """Copy file contents, keeping the bytes in the kernel where possible.
+    
+    Tries copy_file_range (which can share extents on filesystems that
+    support it), then sendfile, then a plain buffered copy. A method that
+    turns out to be unsupported is disabled for the rest of the process.
+    """
+    with open(file_path, 'rb') as src, open(output_path, 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        for func in ('copy_file_range', 'sendfile'):
+            if not _fast_copy[func]:
+                continue
+            try:
+                _kernel_copy(func, src.fileno(), dst.fileno(), size)
+                return func
+            except OSError as e:
+                if e.errno not in FALLBACK_ERRNOS:
+                    raise
+                if e.errno in (errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP):
+                    _fast_copy[func] = False
+                # Start over from a clean destination
+                os.lseek(src.fileno(), 0, os.SEEK_SET)
+                os.lseek(dst.fileno(), 0, os.SEEK_SET)
+                dst.truncate(0)
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    return 'copy'
+
+def place_file(file_path, output_path, link_mode='copy'):
+    """Put file_path's data at output_path by copying or linking.
+    
+    Every method writes under a temporary name that is then renamed over any
+    existing output, so an output that is itself a link (e.g. from an earlier
+    hardlink run) is replaced rather than written through. hardlink and reflink fall back to a copy when the filesystem
+    can't do them (e.g. across devices); symlink always links to the
+    absolute source path. Like shutil.copy2, copying a file onto itself
+    raises SameFileError instead of truncating it; a link that is already
+    in place is left alone. Returns the method actually used.
+    """
+    try:
+        same = os.path.samefile(file_path, output_path)
+    except OSError:
+        same = False
+    if same:
+        if link_mode == 'hardlink' or (link_mode == 'symlink' and os.path.islink(output_path)):
+            return link_mode
+        raise shutil.SameFileError(f"{file_path!r} and {output_path!r} are the same file")
+    
+    if link_mode in ('hardlink', 'symlink'):
+        tmp_path = temp_path(output_path)
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)  # Left over from an interrupted run
+        try:
+            if link_mode == 'hardlink':
+                os.link(file_path, tmp_path)
+            else:
+                os.symlink(os.path.abspath(file_path), tmp_path)
+            os.replace(tmp_path, output_path)
+            return link_mode
+        except OSError as e:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            if link_mode == 'symlink' or e.errno not in FALLBACK_ERRNOS | {errno.EMLINK}:
+                raise
+    
+    tmp_path = temp_path(output_path)
+    method = None
+    try:
+        if link_mode == 'reflink':
+            try:
+                _reflink(file_path, tmp_path)
+                method = 'reflink'
+            except (OSError, ImportError) as e:
+                if isinstance(e, OSError) and e.errno not in FALLBACK_ERRNOS:
+                    raise
+        if method is None:
+            method = copy_data(file_path, tmp_path)
+        shutil.copystat(file_path, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return method
+
+INDEX_FILENAME = '.file_index.sqlite'
+INDEX_COMMIT_EVERY = 1000  # Rows per index transaction
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(file_path):
+    """Return the BLAKE2b hex digest of a file's contents"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FileIndex:
+    """Persistent fingerprint index used to skip files that haven't changed.
+    
+    One row per source path holds the size, mtime and (optionally) content
+    hash seen on the last successful run, the operation settings used, and
+    the size/mtime of the output that was written. A file is unchanged when
+    all of those still match, which costs one primary-key lookup and one
+    stat of the output.
+    """
+    
+    def __init__(self, db_path, config_key, use_hash=False):
+        self.db_path = db_path
+        self.config_key = config_key
+        self.use_hash = use_hash
+        self.skipped = 0
+        self._pending = {}
+        self._uncommitted = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            ' source TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT,'
+            ' config TEXT, output TEXT, output_size INTEGER, output_mtime_ns INTEGER)'
+        )
+    
+    def is_unchanged(self, file_path, stat_result=None, force=False):
+        """Check a source file against the index, remembering its fingerprint for record()"""
+        source = os.path.abspath(file_path)
+        st = stat_result or os.stat(source)
+        row = None
+        if not force:
+            row = self.conn.execute(
+                'SELECT size, mtime_ns, digest, config, output, output_size, output_mtime_ns'
+                ' FROM files WHERE source = ?', (source,)
+            ).fetchone()
+        
+        digest = None
+        if row is not None and row[3] == self.config_key and self._output_intact(row):
+            if row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                return True
+            if self.use_hash and row[0] == st.st_size and row[2]:
+                # Touched but not modified: refresh the mtime and skip it
+                digest = self._digest(source)
+                if digest == row[2]:
+                    self.conn.execute('UPDATE files SET mtime_ns = ? WHERE source = ?',
+                                      (st.st_mtime_ns, source))
+                    self._tick()
+                    return True
+        
+        if self.use_hash and digest is None:
+            digest = self._digest(source)
+        self._pending[source] = (st.st_size, st.st_mtime_ns, digest)
+        return False
+    
+    def _digest(self, source):
+        # Unreadable files are left for the processing step to report
+        try:
+            return hash_file(source)
+        except OSError:
+            return None
+    
+    def _output_intact(self, row):
+        try:
+            out = os.stat(row[4])
+        except (OSError, TypeError):
+            return False
+        return out.st_size == row[5] and out.st_mtime_ns == row[6]
+    
+    def record(self, file_path, output_path):
+        """Store the fingerprint of a successfully processed file"""
+        source = os.path.abspath(file_path)
+        fingerprint = self._pending.pop(source, None)
+        if fingerprint is None or output_path is None:
+            return
+        out = os.stat(output_path)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (source, *fingerprint, self.config_key, os.path.abspath(output_path),
+             out.st_size, out.st_mtime_ns)
+        )
+        self._tick()
+    
+    def discard(self, file_path):
+        """Forget a pending fingerprint (the file failed to process)"""
+        self._pending.pop(os.path.abspath(file_path), None)
+    
+    def _tick(self):
+        self._uncommitted += 1
+        if self._uncommitted >= INDEX_COMMIT_EVERY:
+            self.conn.commit()
+            self._uncommitted = 0
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def split_patterns(patterns):
+    """Accept patterns as a list or a comma-separated string"""
+    if not patterns:
+        return []
+    if isinstance(patterns, str):
+        patterns = patterns.split(',')
+    return [p.strip() for p in patterns if p.strip()]
+
+def compile_patterns(patterns):
+    """Compile glob patterns into a single regex (None if there are none)"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(p)})' for p in patterns))
+
+def walk_files(root, pattern='*', recursive=True, include=None, exclude=None,
+               max_depth=None, skip_dirs=(), stats=None, on_error=None):
+    """Lazily yield os.DirEntry objects for regular files under root.
+    
+    A file matches when its name (or its path relative to root, for patterns
+    containing '/') matches pattern or any include pattern, and nothing in
+    exclude. Excluded directory names are not descended into. Like glob,
+    dotfiles and dot-directories are only matched by patterns starting with
+    '.', and symlinked directories are not followed. Entries carry their
+    cached stat results, so callers don't need to stat again. Directories
+    that can't be read are passed to on_error(path, exc), or printed.
+    """
+    patterns = [pattern] + split_patterns(include)
+    matcher = compile_patterns(patterns)
+    excluder = compile_patterns(split_patterns(exclude))
+    show_hidden = any(p.startswith('.') for p in patterns)
+    by_path = any('/' in p for p in patterns)
+    if not recursive:
+        max_depth = 0
+    
+    # Identify skipped directories by (device, inode) so any spelling matches
+    skip_ids = set()
+    for path in skip_dirs:
+        try:
+            st = os.stat(path)
+            skip_ids.add((st.st_dev, st.st_ino))
+        except OSError:
+            pass
+    
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError as e:
+            if on_error:
+                on_error(directory, e)
+            else:
+                print(f"   ⚠️  Cannot read directory {directory}: {e}")
+            continue
+        
+        for entry in entries:
+            name = entry.name
+            if name.startswith('.') and not show_hidden:
+                continue
+            if excluder and excluder.match(name):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if max_depth is not None and depth >= max_depth:
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    if (st.st_dev, st.st_ino) not in skip_ids:
+                        stack.append((entry.path, depth + 1))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            
+            target = os.path.relpath(entry.path, root).replace(os.sep, '/') if by_path else name
+            if matcher.match(target):
+                if stats is not None:
+                    stats['found'] = stats.get('found', 0) + 1
+                yield entry
+
+def filter_changed(entries, index, force=False):
+    """Yield paths of files the index doesn't already have up to date"""
+    for entry in entries:
+        with instruments.span('index_check'):
+            unchanged = index.is_unchanged(entry.path, stat_result=entry.stat(), force=force)
+        if unchanged:
+            index.skipped += 1
+            continue
+        yield entry.path
+
+DEDUP_MODES = ('off', 'skip', 'hardlink')
+PARTIAL_HASH_SIZE = 64 * 1024  # Bytes hashed from each end of a file in the quick pass
+
+def partial_hash(file_path, size):
+    """Hash the head and tail of a file (the whole file if it's small)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(PARTIAL_HASH_SIZE))
+        if size > 2 * PARTIAL_HASH_SIZE:
+            f.seek(-PARTIAL_HASH_SIZE, os.SEEK_END)
+        digest.update(f.read(PARTIAL_HASH_SIZE))
+    return digest.hexdigest()
+
+def _split_groups(groups, key_func, workers):
+    """Split candidate groups by a key computed in parallel, dropping singletons"""
+    candidates = [entry for group in groups for entry in group]
+    
+    def safe_key(entry):
+        # Unreadable files are never treated as duplicates
+        try:
+            return key_func(entry)
+        except OSError:
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        keys = list(pool.map(safe_key, candidates))
+    
+    buckets = {}
+    for entry, key in zip(candidates, keys):
+        if key is not None:
+            buckets.setdefault(key, []).append(entry)
+    return [group for group in buckets.values() if len(group) > 1]
+
+def find_duplicates(entries, workers=1):
+    """Split entries into unique files and (duplicate, original) pairs.
+    
+    Only files sharing a size are hashed at all; of those, only files that
+    also share a head/tail hash get a full content hash. Within a group of
+    identical files the one with the smallest path is kept as the original.
+    """
+    by_size = {}
+    for entry in entries:
+        by_size.setdefault(entry.stat().st_size, []).append(entry)
+    
+    # Empty files would save nothing, so they stay unique
+    groups = [group for size, group in by_size.items() if size > 0 and len(group) > 1]
+    groups = _split_groups(groups, lambda e: partial_hash(e.path, e.stat().st_size), workers)
+    
+    # Files small enough to be hashed whole by the quick pass are already settled
+    big = [g for g in groups if g[0].stat().st_size > 2 * PARTIAL_HASH_SIZE]
+    settled = [g for g in groups if g[0].stat().st_size <= 2 * PARTIAL_HASH_SIZE]
+    groups = settled + _split_groups(big, lambda e: hash_file(e.path), workers)
+    
+    duplicates = []
+    duplicate_paths = set()
+    for group in groups:
+        group.sort(key=lambda e: e.path)
+        for entry in group[1:]:
+            duplicates.append((entry, group[0]))
+            duplicate_paths.add(entry.path)
+    
+    unique = [entry for group in by_size.values() for entry in group
+              if entry.path not in duplicate_paths]
+    return unique, duplicates
+
+def organize_target(file_path, output_folder):
+    """Output path for the organize operation (one folder per extension)"""
+    filename = os.path.basename(file_path)
+    file_ext = Path(file_path).suffix.lower()
+    if file_ext:
+        return os.path.join(output_folder, file_ext[1:], filename)  # Remove the dot
+    return os.path.join(output_folder, "no_extension", filename)
+
+def store_duplicate(entry, original, output_folder, dedup_mode):
+    """Place a duplicate as a hardlink to its original's output, or skip it.
+    
+    The two outputs then share an inode. That is safe only because every
+    later write replaces an output instead of writing into it (see place_file).
+    """
+    output_path = organize_target(entry.path, output_folder)
+    if dedup_mode == 'skip':
+        return None
+    original_output = organize_target(original.path, output_folder)
+    if output_path == original_output:
+        return output_path
+    if not os.path.exists(original_output):
+        raise FileNotFoundError(f"original was not stored: {original_output}")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    place_file(original_output, output_path, 'hardlink')
+    return output_path
+
+def process_single_file(file_path, output_folder, operation, options=None):
+    """Apply one operation to one file and return a result record"""
+    options = options or {}
+    filename = os.path.basename(file_path)
+    result = {'file': file_path, 'status': 'ok', 'output': None, 'error': None}
+    start = time.perf_counter()
+    
+    try:
+        if operation == 'rename':
+            # Example: add timestamp prefix
+            timestamp = "processed_"
+            new_name = timestamp + filename
+            output_path = os.path.join(output_folder, new_name)
+            with instruments.span('place'):
+                result['method'] = place_file(file_path, output_path, options.get('link_mode', 'copy'))
+            
+        elif operation == 'convert':
+            # Example: convert text to uppercase (for .txt files)
+            if file_path.endswith('.txt'):
+                output_path = os.path.join(output_folder, filename)
+                result['bytes_in'], result['bytes_out'] = stream_transform(file_path, output_path,
+                                 transform=options.get('transform', 'upper'),
+                                 mmap_threshold=options.get('mmap_threshold', MMAP_THRESHOLD))
+            else:
+                # Just copy if not a text file
+                output_path = os.path.join(output_folder, filename)
+                with instruments.span('place'):
+                    result['method'] = place_file(file_path, output_path, options.get('link_mode', 'copy'))
+                
+        elif operation == 'compress':
+            codec = options.get('codec', 'gzip')
+            output_path = os.path.join(output_folder, filename + COMPRESSION_CODECS[codec]['extension'])
+            start = time.perf_counter()
+            bytes_in, bytes_out = compress_file(
+                file_path, output_path, codec=codec,
+                level=options.get('level', DEFAULT_COMPRESSION_LEVEL),
+                threads=options.get('compress_threads', 1),
+                block_size=options.get('block_size', COMPRESS_BLOCK_SIZE))
+            elapsed = time.perf_counter() - start
+            result['bytes_in'] = bytes_in
+            result['bytes_out'] = bytes_out
+            ratio = (bytes_out / bytes_in * 100) if bytes_in else 0
+            speed = (bytes_in / (1024 * 1024) / elapsed) if elapsed > 0 else 0
+            result['note'] = (f"{format_size(bytes_in)} -> {format_size(bytes_out)} "
+                              f"({ratio:.0f}%), {speed:.1f} MB/s")
+            
+        elif operation == 'organize':
+            # Example: organize by file extension
+            output_path = organize_target(file_path, output_folder)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with instruments.span('place'):
+                result['method'] = place_file(file_path, output_path, options.get('link_mode', 'copy'))
+            
+        else:
+            result['status'] = 'skipped'
+            result['error'] = f"Unknown operation: {operation}"
+            return result
+        
+        result['output'] = output_path
+        if 'bytes_in' not in result:
+            result['bytes_in'] = os.stat(file_path).st_size
+            linked = result.get('method') in ('hardlink', 'symlink', 'reflink')
+            result['bytes_out'] = 0 if linked else result['bytes_in']
+        
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    
+    instruments.add_time('file', time.perf_counter() - start)
+    return result
+
+def process_batch(file_paths, output_folder, operation, options=None):
+    """Process a batch of files (one task per batch keeps process-pool IPC cheap)"""
+    return [process_single_file(path, output_folder, operation, options) for path in file_paths]
+
+def process_batch_remote(file_paths, output_folder, operation, options=None):
+    """process_batch for a worker process: also ships back the spans it recorded"""
+    return process_batch(file_paths, output_folder, operation, options), instruments.drain()
+
+def iter_batches(files, batch_size):
+    """Yield lists of up to batch_size items from any iterable"""
+    batch = []
+    for item in files:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run_pool(files, output_folder, operation, workers, executor_type, options=None):
+    """Yield per-file results, spreading work across a bounded worker pool.
+    
+    At most ``workers * 2`` batches are in flight at any time, so memory stays
+    bounded no matter how many files are fed in.
+    """
+    if workers <= 1:
+        for file_path in files:
+            yield process_single_file(file_path, output_folder, operation, options)
+        return
+    
+    if executor_type == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=reset_worker)
+        batch_size = PROCESS_BATCH_SIZE
+        task = process_batch_remote
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+        batch_size = 1
+        task = process_batch
+    
+    def batch_results(future):
+        if task is process_batch_remote:
+            results, raw = future.result()
+            instruments.merge(raw)
+            return results
+        return future.result()
+    
+    max_in_flight = workers * 2
+    pending = set()
+    with pool:
+        for batch in iter_batches(files, batch_size):
+            pending.add(pool.submit(task, batch, output_folder, operation, options))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from batch_results(future)
+        for future in as_completed(pending):
+            yield from batch_results(future)
+
+def resolve_workers(value):
+    """Turn the workers input into a concrete pool size (0/None = auto)"""
+    if not value:
+        return min(32, (os.cpu_count() or 1) + 4)
+    return max(1, int(value))
+
+REPORT_MODES = ('verbose', 'progress', 'quiet', 'json')
+FLUSH_INTERVAL = 0.5  # Seconds between output flushes and progress redraws
+
+class Reporter:
+    """Buffered output for process_files.
+    
+    verbose prints the classic per-file lines, progress keeps a single
+    rate-limited status line with files/s and bytes/s, quiet prints only
+    errors and the summary, and json writes one JSON object per line.
+    Output is collected in memory and written at most every flush_interval
+    seconds; errors are always reported one by one and flushed right away.
+    """
+    
+    def __init__(self, mode='verbose', flush_interval=FLUSH_INTERVAL, stream=None):
+        self.mode = mode
+        self.flush_interval = flush_interval
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty() if hasattr(self.stream, 'isatty') else False
+        self.files = 0
+        self.errors = 0
+        self.bytes = 0
+        self._buffer = []
+        self._bar_visible = False
+        self._start = time.monotonic()
+        self._last_flush = self._start
+    
+    def info(self, text):
+        """Header and status lines (not shown in quiet/json modes)"""
+        if self.mode in ('verbose', 'progress'):
+            self._write(text + '\n')
+    
+    def event(self, name, **data):
+        """Machine-readable event (json mode only)"""
+        if self.mode == 'json':
+            self._write(json.dumps({'event': name, **data}, default=str) + '\n')
+    
+    def problem(self, text, **data):
+        """Report a single error immediately, in every mode"""
+        if self.mode == 'json':
+            self.event('error', message=text, **data)
+        else:
+            self._write(f"{text}\n")
+        self.flush()
+    
+    def file_result(self, result):
+        """Account for one processed file"""
+        name = os.path.basename(result['file'])
+        if result['status'] == 'ok':
+            self.files += 1
+            self.bytes += result.get('bytes_in', 0)
+        elif result['status'] == 'error':
+            self.errors += 1
+        
+        if self.mode == 'json':
+            self.event('file', **{k: v for k, v in result.items() if v is not None})
+            if result['status'] == 'error':
+                self.flush()
+            return
+        
+        if self.mode == 'verbose':
+            self._write(f"🔧 Processing: {name}\n")
+            if result['status'] == 'ok':
+                if result.get('note'):
+                    self._write(f"   📦 {result['note']}\n")
+                self._write("   ✅ Done\n")
+            elif result['status'] == 'skipped':
+                self._write(f"   ⚠️  {result['error']}\n")
+            else:
+                self.problem(f"   ❌ Error: {result['error']}")
+        elif result['status'] == 'error':
+            self.problem(f"❌ {result['file']}: {result['error']}")
+        elif result['status'] == 'skipped' and self.mode == 'progress':
+            self._write(f"⚠️  {name}: {result['error']}\n")
+        else:
+            self._maybe_flush()
+    
+    def duplicate(self, name, original, error=None):
+        """Account for one duplicate handled by the dedup stage"""
+        if error:
+            self.errors += 1
+        if self.mode == 'json':
+            self.event('duplicate', file=name, original=original, error=error)
+        elif self.mode == 'verbose':
+            self._write(f"🔁 Duplicate: {name} (same as {original})\n")
+        if error:
+            self.problem(f"   ❌ Error: {error}" if self.mode == 'verbose' else f"❌ {name}: {error}")
+    
+    def summary(self, lines, **data):
+        """Final summary: text lines for people, data for json mode"""
+        if self.mode == 'json':
+            self.event('summary', **data)
+        else:
+            self._clear_bar()
+            for line in lines:
+                self._buffer.append(line + '\n')
+        self.close()
+    
+    def close(self):
+        self._clear_bar()
+        self.flush()
+    
+    def _progress_line(self):
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        return (f"⏳ {self.files} files | {self.files / elapsed:.0f} files/s | "
+                f"{format_size(self.bytes / elapsed)}/s | {self.errors} errors")
+    
+    def _clear_bar(self):
+        if self._bar_visible:
+            self._buffer.append('\r\x1b[K')
+            self._bar_visible = False
+    
+    def _write(self, text):
+        self._clear_bar()
+        self._buffer.append(text)
+        self._maybe_flush()
+    
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush < self.flush_interval:
+            return
+        if self.mode == 'progress' and self.files + self.errors:
+            self._clear_bar()
+            if self.tty:
+                self._buffer.append(self._progress_line())
+                self._bar_visible = True
+            else:
+                self._buffer.append(self._progress_line() + '\n')
+        self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer.clear()
+        self.stream.flush()
+        self._last_flush = time.monotonic()
+
+@instrumented('file_processor')
 def process_files(inputs):
     """Main file processing logic"""
     source_folder = inputs['source_folder']
@@ -18,101 +921,196 @@ def process_files(inputs):
     operation = inputs['operation'].lower()
     pattern = inputs['pattern']
     recursive = inputs['recursive']
+    workers = resolve_workers(inputs.get('workers', 1))
+    executor_type = inputs.get('executor', DEFAULT_EXECUTOR).lower()
+    options = {
+        'transform': inputs.get('transform', 'upper'),
+        'mmap_threshold': inputs.get('mmap_threshold', MMAP_THRESHOLD),
+        'codec': inputs.get('codec', 'gzip').lower(),
+        'level': inputs.get('level', DEFAULT_COMPRESSION_LEVEL),
+        'compress_threads': resolve_workers(inputs.get('compress_threads', 1)),
+        'block_size': inputs.get('block_size', COMPRESS_BLOCK_SIZE),
+        'link_mode': inputs.get('link_mode', 'copy').lower(),
+    }
+    incremental = inputs.get('incremental', False)
+    force = inputs.get('force', False)
+    max_depth = inputs.get('max_depth')
+    dedup_mode = inputs.get('dedup', 'off').lower()
+    report_mode = inputs.get('report', 'verbose').lower()
+    
+    if report_mode not in REPORT_MODES:
+        print(f"❌ Unknown report mode: {report_mode} (use {'/'.join(REPORT_MODES)})")
+        return 1
+    
+    reporter = Reporter(report_mode, inputs.get('flush_interval', FLUSH_INTERVAL))
+    
+    if executor_type not in ('thread', 'process'):
+        reporter.problem(f"❌ Unknown executor: {executor_type} (use thread/process)")
+        return 1
+    
+    if options['transform'] not in TEXT_TRANSFORMS:
+        reporter.problem(f"❌ Unknown transform: {options['transform']} (use {'/'.join(TEXT_TRANSFORMS)})")
+        return 1
+    
+    if options['link_mode'] not in LINK_MODES:
+        reporter.problem(f"❌ Unknown link mode: {options['link_mode']} (use {'/'.join(LINK_MODES)})")
+        return 1
+    
+    if dedup_mode not in DEDUP_MODES:
+        reporter.problem(f"❌ Unknown dedup mode: {dedup_mode} (use {'/'.join(DEDUP_MODES)})")
+        return 1
+    
+    if options['codec'] not in COMPRESSION_CODECS:
+        reporter.problem(f"❌ Unknown codec: {options['codec']} (use {'/'.join(COMPRESSION_CODECS)})")
+        return 1
+    
+    if options['level'] not in COMPRESSION_CODECS[options['codec']]['levels']:
+        levels = COMPRESSION_CODECS[options['codec']]['levels']
+        reporter.problem(f"❌ Invalid {options['codec']} level: {options['level']} (use {levels.start}-{levels.stop - 1})")
+        return 1
     
-    print(f"🔍 Scanning for files: {pattern}")
-    print(f"📁 Source: {source_folder}")
-    print(f"📁 Output: {output_folder}")
-    print(f"🔄 Operation: {operation}")
-    print(f"📂 Recursive: {'Yes' if recursive else 'No'}")
-    print("-" * 50)
+    reporter.info(f"🔍 Scanning for files: {pattern}")
+    reporter.info(f"📁 Source: {source_folder}")
+    reporter.info(f"📁 Output: {output_folder}")
+    reporter.info(f"🔄 Operation: {operation}")
+    reporter.info(f"📂 Recursive: {'Yes' if recursive else 'No'}")
+    reporter.info(f"⚙️  Workers: {workers} ({executor_type})")
+    if options['link_mode'] != 'copy' and operation != 'compress':
+        reporter.info(f"🔗 Link mode: {options['link_mode']}")
+    if dedup_mode != 'off' and operation == 'organize':
+        reporter.info(f"🧬 Deduplicate: {dedup_mode}")
+    if incremental:
+        reporter.info(f"♻️  Incremental: Yes{' (forced full run)' if force else ''}")
+    reporter.info("-" * 50)
+    reporter.event('start', source=source_folder, output=output_folder, operation=operation,
+                   pattern=pattern, recursive=recursive, workers=workers, executor=executor_type)
     
     # Validate source folder
     if not os.path.exists(source_folder):
-        print(f"❌ Source folder doesn't exist: {source_folder}")
+        reporter.problem(f"❌ Source folder doesn't exist: {source_folder}")
         return 1
     
     # Create output folder if it doesn't exist
     os.makedirs(output_folder, exist_ok=True)
     
-    # Build file search pattern
-    if recursive:
-        search_pattern = os.path.join(source_folder, "**", pattern)
-        files = glob.glob(search_pattern, recursive=True)
-    else:
-        search_pattern = os.path.join(source_folder, pattern)
-        files = glob.glob(search_pattern)
+    # Discover files lazily; processing starts as soon as the first one is found.
+    # The output folder is skipped so files written during the run aren't picked up.
+    scan_stats = {'found': 0}
+    entries = instruments.timed('scan', walk_files(
+        source_folder, pattern, recursive,
+        include=inputs.get('include'), exclude=inputs.get('exclude'),
+        max_depth=max_depth, skip_dirs=[output_folder], stats=scan_stats,
+        on_error=lambda path, e: reporter.problem(f"⚠️  Cannot read directory {path}: {e}", file=path)))
     
-    if not files:
-        print(f"⚠️  No files found matching pattern: {pattern}")
-        return 0
+    duplicates = []
+    if dedup_mode != 'off' and operation == 'organize':
+        # Grouping by size needs the full listing, so dedup gives up streaming
+        with instruments.span('dedup'):
+            entries, duplicates = find_duplicates(entries, workers)
+        reporter.info(f"🧬 Found {len(duplicates)} duplicate files")
+    files = (entry.path for entry in entries)
     
-    print(f"📊 Found {len(files)} files to process")
+    index = None
+    if incremental:
+        # Only settings that change the output bytes invalidate the index
+        config_key = json.dumps({
+            'operation': operation,
+            'transform': options['transform'] if operation == 'convert' else None,
+            'codec': options['codec'] if operation == 'compress' else None,
+            'level': options['level'] if operation == 'compress' else None,
+            'link_mode': options['link_mode'] if operation != 'compress' else None,
+        }, sort_keys=True)
+        index = FileIndex(os.path.join(output_folder, INDEX_FILENAME), config_key,
+                          use_hash=inputs.get('hash', False))
+        files = filter_changed(entries, index, force=force)
     
     processed_count = 0
     error_count = 0
+    bytes_in_total = 0
+    bytes_out_total = 0
+    methods = {}
+    start_time = time.perf_counter()
     
-    for file_path in files:
-        try:
-            filename = os.path.basename(file_path)
-            print(f"🔧 Processing: {filename}")
-            
-            if operation == 'rename':
-                # Example: add timestamp prefix
-                timestamp = "processed_"
-                new_name = timestamp + filename
-                output_path = os.path.join(output_folder, new_name)
-                shutil.copy2(file_path, output_path)
-                
-            elif operation == 'convert':
-                # Example: convert text to uppercase (for .txt files)
-                if file_path.endswith('.txt'):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read().upper()
-                    output_path = os.path.join(output_folder, filename)
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(content)
-                else:
-                    # Just copy if not a text file
-                    output_path = os.path.join(output_folder, filename)
-                    shutil.copy2(file_path, output_path)
-                    
-            elif operation == 'compress':
-                # Example: create a compressed copy (this would need actual compression)
-                output_path = os.path.join(output_folder, filename)
-                shutil.copy2(file_path, output_path)
-                print(f"   📦 (Compression logic would go here)")
-                
-            elif operation == 'organize':
-                # Example: organize by file extension
-                file_ext = Path(file_path).suffix.lower()
-                if file_ext:
-                    ext_folder = os.path.join(output_folder, file_ext[1:])  # Remove the dot
-                    os.makedirs(ext_folder, exist_ok=True)
-                    output_path = os.path.join(ext_folder, filename)
-                else:
-                    output_path = os.path.join(output_folder, "no_extension", filename)
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                shutil.copy2(file_path, output_path)
-                
+    try:
+        for result in run_pool(files, output_folder, operation, workers, executor_type, options):
+            reporter.file_result(result)
+            instruments.count(f"files_{result['status']}")
+            instruments.count('bytes_in', result.get('bytes_in', 0))
+            instruments.count('bytes_out', result.get('bytes_out', 0))
+            if result['status'] == 'ok':
+                processed_count += 1
+                bytes_in_total += result.get('bytes_in', 0)
+                bytes_out_total += result.get('bytes_out', 0)
+                if result.get('method'):
+                    methods[result['method']] = methods.get(result['method'], 0) + 1
+                if index:
+                    index.record(result['file'], result['output'])
             else:
-                print(f"   ⚠️  Unknown operation: {operation}")
-                continue
-                
-            processed_count += 1
-            print(f"   ✅ Done")
-            
+                if result['status'] == 'error':
+                    error_count += 1
+                if index:
+                    index.discard(result['file'])
+    finally:
+        if index:
+            index.close()
+    
+    # Duplicates go last so the originals they link to are already in place
+    duplicate_count = 0
+    same_name_count = 0
+    saved_bytes = 0
+    targets = set()
+    for entry, original in duplicates:
+        # A duplicate whose target already holds the same content (its original's
+        # output, or another copy's) would only overwrite it, so dedup saves nothing
+        target = organize_target(entry.path, output_folder)
+        if target == organize_target(original.path, output_folder) or target in targets:
+            same_name_count += 1
+            continue
+        targets.add(target)
+        try:
+            store_duplicate(entry, original, output_folder, dedup_mode)
+            duplicate_count += 1
+            saved_bytes += entry.stat().st_size
+            reporter.duplicate(entry.name, original.name)
         except Exception as e:
             error_count += 1
-            print(f"   ❌ Error: {str(e)}")
+            reporter.duplicate(entry.name, original.name, error=str(e))
     
-    print("-" * 50)
-    print(f"📊 Processing Summary:")
-    print(f"   ✅ Successfully processed: {processed_count} files")
+    elapsed = time.perf_counter() - start_time
+    
+    if scan_stats['found'] == 0:
+        reporter.summary([f"⚠️  No files found matching pattern: {pattern}"], found=0)
+        return 0
+    
+    lines = ["-" * 50, "📊 Processing Summary:",
+             f"   🔍 Files found: {scan_stats['found']}",
+             f"   ✅ Successfully processed: {processed_count} files"]
     if error_count > 0:
-        print(f"   ❌ Errors encountered: {error_count} files")
-    print(f"   📁 Output location: {output_folder}")
+        lines.append(f"   ❌ Errors encountered: {error_count} files")
+    if duplicates:
+        verb = 'hardlinked' if dedup_mode == 'hardlink' else 'skipped'
+        lines.append(f"   🧬 Duplicates {verb}: {duplicate_count} files, {format_size(saved_bytes)} saved")
+    if same_name_count:
+        lines.append(f"   🧬 Duplicates with their original's name (stored once): {same_name_count} files")
+    if methods:
+        lines.append(f"   🔗 Placed via: {', '.join(f'{m} {n}' for m, n in sorted(methods.items()))}")
+    if index:
+        lines.append(f"   ♻️  Unchanged (skipped): {index.skipped} files")
+    if bytes_in_total:
+        speed = bytes_in_total / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        lines.append(f"   📦 Bytes in: {format_size(bytes_in_total)}, bytes out: {format_size(bytes_out_total)}")
+        lines.append(f"   🚀 Throughput: {speed:.1f} MB/s over {elapsed:.2f} seconds")
+    lines.append(f"   📁 Output location: {output_folder}")
+    
+    reporter.summary(lines, found=scan_stats['found'], processed=processed_count,
+                     errors=error_count, duplicates=duplicate_count, saved_bytes=saved_bytes,
+                     same_name_duplicates=same_name_count,
+                     unchanged=index.skipped if index else 0, methods=methods,
+                     bytes_in=bytes_in_total, bytes_out=bytes_out_total,
+                     seconds=round(elapsed, 3), output=output_folder)
     
-    return 0
+    # Nonzero when any file failed, so callers (and the result cache) don't treat it as done
+    return 1 if error_count else 0
 
 def main():
     """Main entry point"""
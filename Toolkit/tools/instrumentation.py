@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Instrumentation shared by the toolkit's tools
+
+Spans accumulate wall time per phase (scan, read, transform, write,
+sample...) and counters accumulate amounts (bytes, files, samples). Both
+are cheap enough to stay on in production runs. When a tool is given a
+'metrics_file' input, the run's totals are written there as JSON,
+optionally with a cProfile ('profile': 'cpu') or tracemalloc
+('profile': 'memory') report of the hottest functions or allocation sites.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_MODES = ('cpu', 'memory')
+PROFILE_TOP = 25  # Entries kept in a profile report
+
+class Instruments:
+    """Thread-safe span timers and counters for one run"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.spans = {}  # name -> [calls, total, min, max]
+            self.counters = {}
+    
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block under name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+    
+    def add_time(self, name, seconds, calls=1):
+        with self._lock:
+            entry = self.spans.get(name)
+            if entry is None:
+                self.spans[name] = [calls, seconds, seconds, seconds]
+            else:
+                entry[0] += calls
+                entry[1] += seconds
+                entry[2] = min(entry[2], seconds)
+                entry[3] = max(entry[3], seconds)
+    
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def timed(self, name, iterable):
+        """Yield from iterable, charging the time spent producing items to name.
+        
+        Meant for lazy pipelines (e.g. a directory walk feeding a worker
+        pool), where the producer's work is interleaved with the consumer's.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+    
+    def drain(self):
+        """Return the raw totals and reset, for shipping out of a worker process"""
+        with self._lock:
+            raw = {'spans': self.spans, 'counters': self.counters}
+            self.spans = {}
+            self.counters = {}
+        return raw
+    
+    def merge(self, raw):
+        """Fold totals from drain() (e.g. a worker process) into this run"""
+        for name, (calls, total, low, high) in raw['spans'].items():
+            with self._lock:
+                entry = self.spans.get(name)
+                if entry is None:
+                    self.spans[name] = [calls, total, low, high]
+                else:
+                    entry[0] += calls
+                    entry[1] += total
+                    entry[2] = min(entry[2], low)
+                    entry[3] = max(entry[3], high)
+        for name, amount in raw['counters'].items():
+            self.count(name, amount)
+    
+    def snapshot(self):
+        with self._lock:
+            spans = {name: {'calls': calls, 'total': round(total, 6), 'mean': round(total / calls, 6),
+                            'min': round(low, 6), 'max': round(high, 6)}
+                     for name, (calls, total, low, high) in self.spans.items()}
+            return {'spans': spans, 'counters': dict(self.counters)}
+
+# One set of instruments per process; tools record into it directly
+instruments = Instruments()
+span = instruments.span
+count = instruments.count
+timed = instruments.timed
+
+def reset_worker():
+    """Process pool initializer: forget the totals a forked worker inherited.
+    
+    Otherwise the worker's first drain() ships the parent's spans back and
+    they are counted twice.
+    """
+    instruments.reset()
+
+def cpu_profile_report(profiler):
+    """Top functions by cumulative time from a cProfile run"""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+    return [{'function': f"{func} ({os.path.basename(filename)}:{line})",
+             'calls': calls, 'self': round(self_time, 6), 'cumulative': round(cumulative, 6)}
+            for (filename, line, func), (_, calls, self_time, cumulative, _) in rows]
+
+def memory_profile_report(snapshot):
+    """Top allocation sites still live at the end of a tracemalloc run"""
+    return [{'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             'size': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:PROFILE_TOP]]
+
+@contextmanager
+def session(tool, inputs):
+    """Instrument one tool run as configured by its inputs.
+    
+    Counters and spans start from zero. With 'metrics_file' (or 'profile')
+    set, the results are written as JSON when the run ends, even if it
+    fails. The CPU profile only covers the calling thread, so work done in
+    pool threads shows up as waiting in the main thread. The totals are
+    process-wide, so only one instrumented run may be in progress per
+    process (the toolkit daemon runs those alone).
+    """
+    instruments.reset()
+    profile = (inputs.get('profile') or '').lower() or None
+    metrics_file = inputs.get('metrics_file') or (f"{tool}_metrics.json" if profile else None)
+    if metrics_file is None:
+        yield
+        return
+    if profile not in (None,) + PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {profile} (use {'/'.join(PROFILE_MODES)})")
+    
+    profiler = None
+    if profile == 'cpu':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif profile == 'memory':
+        tracemalloc.start()
+    started = datetime.now()
+    start = time.perf_counter()
+    
+    try:
+        yield
+    finally:
+        wall_time = time.perf_counter() - start
+        report = dict({'tool': tool, 'started': started.isoformat(timespec='seconds'),
+                       'wall_time': round(wall_time, 6), 'profile': profile},
+                      **instruments.snapshot())
+        if profile == 'cpu':
+            profiler.disable()
+            report['cpu_profile'] = cpu_profile_report(profiler)
+        elif profile == 'memory':
+            report['memory_peak'] = tracemalloc.get_traced_memory()[1]
+            report['memory_profile'] = memory_profile_report(tracemalloc.take_snapshot())
+            tracemalloc.stop()
+        
+        try:
+            with open(metrics_file, 'w') as f:
+                json.dump(report, f, indent=2)
+        except OSError as e:
+            print(f"   ⚠️  Could not write metrics to {metrics_file}: {e}")
+
+def instrumented(tool):
+    """Decorator running a tool's entry function inside session()"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(inputs):
+            with session(tool, inputs):
+                return func(inputs)
+        return wrapper
+    return decorate
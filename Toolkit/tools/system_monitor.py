@@ -4,101 +4,694 @@ System Monitor Tool
 Monitor system resources and generate alerts
 """
 
+import heapq
 import json
+import os
+import queue
+import struct
 import sys
+import threading
 import time
 import psutil
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from instrumentation import instruments, instrumented
 
+TOOL_INFO = {
+    'id': 4,
+    'name': 'System Monitor',
+    'description': 'Monitor system resources and generate alerts',
+    'entry': 'monitor_system',
+    'timeout': {'input': 'duration', 'scale': 60, 'grace': 60},
+    # Optional file settings and their defaults; relative ones are resolved against the caller's directory
+    'path_settings': {'alert_log': 'system_alerts.log', 'history_file': None},
+    'inputs': [
+        {'name': 'check_type', 'prompt': 'Check (cpu/memory/disk/all): ', 'type': 'str'},
+        {'name': 'threshold', 'prompt': 'Alert threshold (%): ', 'type': 'int'},
+        {'name': 'duration', 'prompt': 'Monitor duration (minutes): ', 'type': 'int'},
+        {'name': 'interval', 'prompt': 'Sampling interval in seconds (Enter = 30): ', 'type': 'float', 'default': 30}
+    ]
+}
+
+# (metric name, label, icon) in reporting order
+METRICS = [
+    ('cpu', 'CPU', '🔄'),
+    ('memory', 'Memory', '🧠'),
+    ('disk', 'Disk', '💾'),
+]
+
+DEFAULT_INTERVAL = 30  # Seconds between samples
+CPU_WARMUP = 0.5  # Max seconds between priming the CPU counters and the first sample
+
+def sample_cpu():
+    # Non-blocking: usage since the previous call, measured from kernel counters
+    return psutil.cpu_percent(interval=None)
+
+def sample_memory():
+    return psutil.virtual_memory().percent
+
+def sample_disk():
+    disk = psutil.disk_usage('/')
+    return (disk.used / disk.total) * 100
+
+SAMPLERS = {
+    'cpu': sample_cpu,
+    'memory': sample_memory,
+    'disk': sample_disk,
+}
+
+def selected_metrics(check_type):
+    """Metric names covered by a check type, in reporting order"""
+    return [name for name, _, _ in METRICS if check_type in (name, 'all')]
+
+def collect_metrics(check_type, cpu_interval=None, pool=None):
+    """Take one sample of the requested metrics, as percentages.
+    
+    With cpu_interval=None the CPU figure is the usage since the previous
+    call, so sampling never blocks; pass a number of seconds to measure over
+    a blocking window instead. With a pool the metrics are sampled
+    concurrently, so a slow disk_usage() can't delay the CPU reading.
+    """
+    def sample(name):
+        if name == 'cpu' and cpu_interval is not None:
+            return psutil.cpu_percent(interval=cpu_interval)
+        return SAMPLERS[name]()
+    
+    names = selected_metrics(check_type)
+    if pool is None or len(names) < 2:
+        return {name: sample(name) for name in names}
+    
+    futures = {name: pool.submit(sample, name) for name in names}
+    return {name: future.result() for name, future in futures.items()}
+
+class SampleScheduler:
+    """Fixed-rate ticks that don't drift.
+    
+    Tick n is due at first_tick + n * interval, so the time spent sampling
+    and printing is absorbed instead of accumulating. If a tick runs so late
+    that later ones are already due, those are counted in ``missed`` and
+    skipped rather than fired back to back.
+    """
+    
+    def __init__(self, interval, end_time, first_tick=None, clock=time.monotonic, sleep=time.sleep):
+        self.interval = interval
+        self.end_time = end_time
+        self.clock = clock
+        self.sleep = sleep
+        self.first_tick = clock() if first_tick is None else first_tick
+        self.ticks = 0
+        self.missed = 0
+    
+    def __iter__(self):
+        due = self.first_tick
+        while due < self.end_time:
+            delay = due - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+            yield due
+            self.ticks += 1
+            due += self.interval
+            behind = self.clock() - due
+            if behind >= self.interval:
+                skipped = int(behind // self.interval)
+                self.missed += skipped
+                due += skipped * self.interval
+
+RAW_CAPACITY = 3600  # Raw samples kept per metric (1 hour at 1 s)
+# Rollup resolution in seconds -> buckets kept (1 day, 1 week, 90 days)
+ROLLUPS = {60: 1440, 300: 2016, 3600: 2160}
+STORE_MAGIC = b'TSS1'
+
+class RingBuffer:
+    """Fixed-capacity circular buffer backed by a typed array"""
+    
+    def __init__(self, capacity, typecode='d'):
+        self.capacity = capacity
+        self.data = array(typecode, bytes(capacity * array(typecode).itemsize))
+        self.start = 0
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, i):
+        # Logical index: 0 is the oldest item, -1 the newest
+        if i < 0:
+            i += self.size
+        return self.data[(self.start + i) % self.capacity]
+    
+    def append(self, value):
+        if self.size < self.capacity:
+            self.data[(self.start + self.size) % self.capacity] = value
+            self.size += 1
+        else:
+            self.data[self.start] = value
+            self.start = (self.start + 1) % self.capacity
+    
+    def set_last(self, value):
+        self.data[(self.start + self.size - 1) % self.capacity] = value
+    
+    def values(self, first=0):
+        """Items from logical index first to the newest, oldest first"""
+        begin = (self.start + first) % self.capacity
+        count = self.size - first
+        if begin + count <= self.capacity:
+            return self.data[begin:begin + count]
+        return self.data[begin:] + self.data[:count - (self.capacity - begin)]
+    
+    def bisect(self, value):
+        """First logical index whose item is >= value (items must be sorted)"""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+class MetricSeries:
+    """Raw samples plus min/avg/max rollups for one metric, in fixed memory"""
+    
+    def __init__(self, raw_capacity=RAW_CAPACITY, rollups=None):
+        self.times = RingBuffer(raw_capacity, 'd')
+        self.values = RingBuffer(raw_capacity, 'f')
+        self.rollups = {}
+        for resolution, capacity in (rollups or ROLLUPS).items():
+            self.rollups[resolution] = {
+                'start': RingBuffer(capacity, 'd'),
+                'min': RingBuffer(capacity, 'f'),
+                'max': RingBuffer(capacity, 'f'),
+                'sum': RingBuffer(capacity, 'd'),
+                'count': RingBuffer(capacity, 'L'),
+            }
+    
+    def add(self, timestamp, value):
+        self.times.append(timestamp)
+        self.values.append(value)
+        for resolution, buckets in self.rollups.items():
+            bucket_start = timestamp - (timestamp % resolution)
+            if len(buckets['start']) and buckets['start'][-1] == bucket_start:
+                buckets['min'].set_last(min(buckets['min'][-1], value))
+                buckets['max'].set_last(max(buckets['max'][-1], value))
+                buckets['sum'].set_last(buckets['sum'][-1] + value)
+                buckets['count'].set_last(buckets['count'][-1] + 1)
+            else:
+                buckets['start'].append(bucket_start)
+                buckets['min'].append(value)
+                buckets['max'].append(value)
+                buckets['sum'].append(value)
+                buckets['count'].append(1)
+    
+    def rings(self):
+        """Every ring in a fixed order (used for persistence)"""
+        yield self.times
+        yield self.values
+        for resolution in sorted(self.rollups):
+            for field in ('start', 'min', 'max', 'sum', 'count'):
+                yield self.rollups[resolution][field]
+
+class TimeSeriesStore:
+    """In-memory metric history with windowed queries and a compact binary file format.
+    
+    Memory is fixed up front: each metric keeps RAW_CAPACITY raw samples and
+    a bounded number of 1m/5m/1h rollup buckets, so a monitor can run for
+    months without growing. Queries use binary search over the timestamp
+    ring, which keeps them well under a millisecond.
+    """
+    
+    def __init__(self, raw_capacity=RAW_CAPACITY, rollups=None):
+        self.raw_capacity = raw_capacity
+        self.rollup_config = dict(rollups or ROLLUPS)
+        self.series = {}
+    
+    def _series(self, metric):
+        if metric not in self.series:
+            self.series[metric] = MetricSeries(self.raw_capacity, self.rollup_config)
+        return self.series[metric]
+    
+    def add(self, metric, value, timestamp=None):
+        self._series(metric).add(time.time() if timestamp is None else timestamp, value)
+    
+    def add_sample(self, metrics, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for metric, value in metrics.items():
+            self.add(metric, value, timestamp)
+    
+    def window(self, metric, seconds=None, now=None):
+        """Raw values from the last `seconds` (all raw values if None)"""
+        series = self.series.get(metric)
+        if series is None or not len(series.times):
+            return array('f')
+        if seconds is None:
+            return series.values.values()
+        now = series.times[-1] if now is None else now
+        return series.values.values(series.times.bisect(now - seconds))
+    
+    def stats(self, metric, seconds=None, now=None):
+        """count/min/avg/max over a window of raw samples"""
+        values = self.window(metric, seconds, now)
+        if not values:
+            return {'count': 0, 'min': None, 'avg': None, 'max': None}
+        return {'count': len(values), 'min': min(values),
+                'avg': sum(values) / len(values), 'max': max(values)}
+    
+    def percentile(self, metric, pct, seconds=None, now=None):
+        """Linear-interpolated percentile over a window of raw samples"""
+        values = sorted(self.window(metric, seconds, now))
+        if not values:
+            return None
+        rank = (len(values) - 1) * pct / 100
+        low = int(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+    
+    def rollup(self, metric, resolution, seconds=None, now=None):
+        """(bucket_start, min, avg, max, count) tuples at a rollup resolution"""
+        series = self.series.get(metric)
+        if series is None or resolution not in series.rollups:
+            return []
+        buckets = series.rollups[resolution]
+        first = 0
+        if seconds is not None and len(buckets['start']):
+            now = buckets['start'][-1] + resolution if now is None else now
+            first = buckets['start'].bisect(now - seconds - resolution)
+        columns = [buckets[field].values(first) for field in ('start', 'min', 'sum', 'max', 'count')]
+        return [(start, low, total / count, high, count)
+                for start, low, total, high, count in zip(*columns)]
+    
+    def save(self, path):
+        """Write the store to a compact binary file (atomically)"""
+        header = {
+            'byteorder': sys.byteorder,
+            'raw_capacity': self.raw_capacity,
+            'rollups': {str(k): v for k, v in self.rollup_config.items()},
+            'metrics': {name: [len(ring) for ring in series.rings()]
+                        for name, series in self.series.items()},
+        }
+        encoded = json.dumps(header).encode('utf-8')
+        # Unique per writer: monitors sharing the daemon may save the same file
+        tmp_path = f"{path}.tmp{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(STORE_MAGIC + struct.pack('<I', len(encoded)) + encoded)
+                for series in self.series.values():
+                    for ring in series.rings():
+                        # Only live items are written, oldest first
+                        ring.values().tofile(f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    @classmethod
+    def load(cls, path):
+        """Read a store written by save()"""
+        with open(path, 'rb') as f:
+            if f.read(4) != STORE_MAGIC:
+                raise ValueError(f"Not a metric history file: {path}")
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length).decode('utf-8'))
+            store = cls(header['raw_capacity'], {int(k): v for k, v in header['rollups'].items()})
+            for name, sizes in header['metrics'].items():
+                series = store._series(name)
+                for ring, size in zip(series.rings(), sizes):
+                    data = array(ring.data.typecode)
+                    data.fromfile(f, size)
+                    if header['byteorder'] != sys.byteorder:
+                        data.byteswap()
+                    ring.data[:size] = data
+                    ring.start, ring.size = 0, size
+        return store
+
+PROCESS_ATTRS = ['name', 'cpu_percent', 'memory_info']  # Only what the top-N report needs
+
+class ProcessTracker:
+    """Incremental per-process CPU and memory tracking for top-N reports.
+    
+    psutil.process_iter() keeps its Process objects in a module-level table
+    across calls: only PIDs that are new since the last call get an object,
+    exited ones are dropped, and a PID that psutil has seen reused gets a
+    fresh one. Each tick reads a restricted attribute list through as_dict(),
+    which uses oneshot() to read each /proc file once. Because the objects
+    persist, cpu_percent(None) returns the usage since the previous tick
+    without blocking. sample() is serialized, so monitors running side by
+    side in one process (the toolkit daemon) can share a tracker.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total_memory = psutil.virtual_memory().total
+        self.processes = 0
+        self.scans = 0
+        self.scan_seconds = 0.0
+    
+    def sample(self):
+        """Return [(pid, name, cpu_percent, rss_percent)] for every live process"""
+        with self.lock:
+            return self._sample()
+    
+    def _sample(self):
+        start = time.perf_counter()
+        rows = []
+        self.processes = 0
+        for proc in psutil.process_iter(PROCESS_ATTRS):
+            self.processes += 1
+            info = proc.info
+            if info['memory_info'] is None:  # AccessDenied
+                continue
+            rss_percent = info['memory_info'].rss / self.total_memory * 100
+            rows.append((proc.pid, info['name'], info['cpu_percent'] or 0.0, rss_percent))
+        
+        self.scans += 1
+        self.scan_seconds += time.perf_counter() - start
+        return rows
+    
+    @staticmethod
+    def top(rows, n, by='cpu'):
+        column = 2 if by == 'cpu' else 3
+        return heapq.nlargest(n, rows, key=lambda row: row[column])
+
+_shared_tracker = None
+
+def shared_process_tracker():
+    """The process-wide ProcessTracker.
+    
+    In a long-lived process its cached psutil handles and CPU baselines
+    carry over between runs, so even the first tick of a new run reports
+    real per-process CPU usage and only new PIDs cost a lookup. The
+    handles live in psutil's own table, so monitors must share this
+    tracker rather than each scanning with their own.
+    """
+    global _shared_tracker
+    if _shared_tracker is None:
+        _shared_tracker = ProcessTracker()
+    return _shared_tracker
+
+def format_processes(rows, by='cpu'):
+    column = 2 if by == 'cpu' else 3
+    return ', '.join(f"{row[1]}({row[0]}) {row[column]:.1f}%" for row in rows)
+
+ALERT_LOG = 'system_alerts.log'
+ALERT_MODES = ('change', 'every')
+LOG_FLUSH_INTERVAL = 5.0  # Seconds between batched log writes
+LOG_MAX_BYTES = 1024 * 1024  # Rotate the alert log past this size
+LOG_BACKUPS = 5  # Rotated files kept (system_alerts.log.1 ... .5)
+
+class AlertLogWriter:
+    """Background alert log writer that batches, collapses repeats and rotates.
+    
+    log() only queues the line; a worker thread keeps the file open, writes
+    queued lines every flush_interval seconds and replaces runs of an
+    identical message with a single "repeated N times" line. The file is
+    rotated when it would grow past max_bytes or, if rotate_seconds is set,
+    once it has been open that long.
+    """
+    
+    def __init__(self, path=ALERT_LOG, flush_interval=LOG_FLUSH_INTERVAL,
+                 max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUPS, rotate_seconds=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rotate_seconds = rotate_seconds
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._file = None
+        self._opened_at = 0.0
+        self._last_message = None
+        self._last_timestamp = None
+        self._repeats = 0
+        self._thread = threading.Thread(target=self._run, name='alert-log-writer', daemon=True)
+        self._thread.start()
+    
+    def log(self, timestamp, message):
+        self._queue.put((timestamp, message))
+    
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+    
+    def _run(self):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False
+            
+            if item:
+                self._collapse(item, pending)
+            if item is None or time.monotonic() >= deadline:
+                if item is None:
+                    self._end_repeats(pending)
+                self._write(pending)
+                pending = []
+                deadline = time.monotonic() + self.flush_interval
+            if item is None:
+                break
+        
+        if self._file:
+            self._file.close()
+    
+    def _collapse(self, item, pending):
+        timestamp, message = item
+        if message == self._last_message:
+            self._repeats += 1
+            self._last_timestamp = timestamp
+            return
+        self._end_repeats(pending)
+        pending.append(f"[{timestamp}] {message}\n")
+        self._last_message = message
+        self._last_timestamp = timestamp
+    
+    def _end_repeats(self, pending):
+        if self._repeats:
+            times = 'time' if self._repeats == 1 else 'times'
+            pending.append(f"[{self._last_timestamp}] Last message repeated {self._repeats} {times}\n")
+            self._repeats = 0
+    
+    def _write(self, lines):
+        if not lines:
+            return
+        data = ''.join(lines)
+        try:
+            if self._file is None:
+                self._open()
+            if self._should_rotate(len(data.encode('utf-8'))):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+        except OSError as e:
+            self.errors += 1
+            print(f"   ❌ Failed to log alert: {e}", flush=True)
+    
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._opened_at = time.monotonic()
+    
+    def _should_rotate(self, incoming):
+        if self.max_bytes and self._file.tell() and self._file.tell() + incoming > self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.monotonic() - self._opened_at >= self.rotate_seconds
+    
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+class AlertTracker:
+    """Per-metric alert state with hysteresis and cooldown.
+    
+    A metric raises an alert when it goes above the threshold and clears
+    once it falls to threshold - hysteresis or below, so values hovering
+    around the threshold don't flap. After firing, the same metric can't
+    fire again for cooldown seconds.
+    """
+    
+    def __init__(self, threshold, hysteresis=0.0, cooldown=0.0, clock=time.monotonic):
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.clock = clock
+        self.active = {}
+        self.last_fired = {}
+    
+    def update(self, name, value):
+        """Return 'raised', 'cleared' or None for a new reading"""
+        if not self.active.get(name):
+            if value <= self.threshold:
+                return None
+            now = self.clock()
+            if name in self.last_fired and now - self.last_fired[name] < self.cooldown:
+                return None
+            self.active[name] = True
+            self.last_fired[name] = now
+            return 'raised'
+        if value <= self.threshold - self.hysteresis:
+            self.active[name] = False
+            return 'cleared'
+        return None
+
+@instrumented('system_monitor')
 def monitor_system(inputs):
     """Monitor system resources"""
     check_type = inputs['check_type'].lower()
     threshold = inputs['threshold']
     duration = inputs['duration']
+    interval = float(inputs.get('interval', DEFAULT_INTERVAL))
+    history_file = inputs.get('history_file')
+    alert_mode = inputs.get('alert_on', 'change').lower()
+    alert_log = inputs.get('alert_log', ALERT_LOG)
+    top_n = int(inputs.get('top_processes', 0))
+    
+    if interval <= 0:
+        print(f"❌ Sampling interval must be positive: {interval}")
+        return 1
+    
+    if alert_mode not in ALERT_MODES:
+        print(f"❌ Unknown alert mode: {alert_mode} (use {'/'.join(ALERT_MODES)})")
+        return 1
+    
+    store = TimeSeriesStore()
+    if history_file and os.path.exists(history_file):
+        try:
+            store = TimeSeriesStore.load(history_file)
+            print(f"📚 Loaded metric history from {history_file}")
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  Ignoring unreadable history file: {e}")
     
     print(f"🖥️  System Monitor Started")
     print(f"📊 Monitoring: {check_type}")
     print(f"⚠️  Alert threshold: {threshold}%")
     print(f"⏱️  Duration: {duration} minutes")
+    print(f"🔁 Sampling every {interval:g} seconds")
+    print(f"🔔 Alerts: {'on state change' if alert_mode == 'change' else 'every check'}")
+    if top_n:
+        print(f"🔝 Tracking top {top_n} processes")
     print("-" * 50)
     
-    start_time = time.time()
+    start_time = time.monotonic()
     end_time = start_time + (duration * 60)  # Convert to seconds
     alert_count = 0
     check_count = 0
+    time_format = "%H:%M:%S.%f" if interval < 1 else "%H:%M:%S"
+    
+    # Prime the CPU counters so the first non-blocking reading covers a real window
+    psutil.cpu_percent(interval=None)
+    scheduler = SampleScheduler(interval, end_time, first_tick=start_time + min(interval, CPU_WARMUP))
+    processes = shared_process_tracker() if top_n else None
+    tracker = AlertTracker(threshold, float(inputs.get('hysteresis', 0)), float(inputs.get('cooldown', 0)))
+    writer = AlertLogWriter(alert_log,
+                            flush_interval=float(inputs.get('log_flush_interval', LOG_FLUSH_INTERVAL)),
+                            max_bytes=int(inputs.get('log_max_bytes', LOG_MAX_BYTES)),
+                            rotate_seconds=inputs.get('log_rotate_seconds'))
     
     try:
-        while time.time() < end_time:
-            check_count += 1
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            
-            alerts = []
-            
-            # CPU Check
-            if check_type in ['cpu', 'all']:
-                cpu_percent = psutil.cpu_percent(interval=1)
-                print(f"[{timestamp}] 🔄 CPU Usage: {cpu_percent:.1f}%", end="", flush=True)
-                if cpu_percent > threshold:
-                    alerts.append(f"CPU: {cpu_percent:.1f}%")
-                    print(" ⚠️  HIGH!", flush=True)
-                else:
-                    print(" ✅", flush=True)
-            
-            # Memory Check  
-            if check_type in ['memory', 'all']:
-                memory = psutil.virtual_memory()
-                memory_percent = memory.percent
-                print(f"[{timestamp}] 🧠 Memory Usage: {memory_percent:.1f}%", end="", flush=True)
-                if memory_percent > threshold:
-                    alerts.append(f"Memory: {memory_percent:.1f}%")
-                    print(" ⚠️  HIGH!", flush=True)
-                else:
-                    print(" ✅", flush=True)
-            
-            # Disk Check
-            if check_type in ['disk', 'all']:
-                disk = psutil.disk_usage('/')
-                disk_percent = (disk.used / disk.total) * 100
-                print(f"[{timestamp}] 💾 Disk Usage: {disk_percent:.1f}%", end="", flush=True)
-                if disk_percent > threshold:
-                    alerts.append(f"Disk: {disk_percent:.1f}%")
-                    print(" ⚠️  HIGH!", flush=True)
-                else:
-                    print(" ✅", flush=True)
-            
-            # Handle alerts
-            if alerts:
-                alert_count += 1
-                print(f"🚨 ALERT #{alert_count}: {', '.join(alerts)}", flush=True)
+        with ThreadPoolExecutor(max_workers=len(SAMPLERS)) as pool:
+            for _ in scheduler:
+                check_count += 1
+                timestamp = datetime.now().strftime(time_format)
+                if interval < 1:
+                    timestamp = timestamp[:-3]  # Milliseconds
                 
-                # You could add email notifications, logging, etc. here
-                log_alert(alerts, timestamp)
-            
-            print(f"   💤 Sleeping for 30 seconds...", flush=True)
-            time.sleep(30)  # Check every 30 seconds
+                with instruments.span('sample'):
+                    metrics = collect_metrics(check_type, pool=pool)
+                with instruments.span('store'):
+                    store.add_sample(metrics)
+                instruments.count('samples')
+                alerts = []
+                cleared = []
+                lines = []
+                
+                # Top consumers, attached to CPU/memory alerts so they name a culprit
+                culprits = {}
+                if processes:
+                    with instruments.span('processes'):
+                        rows = processes.sample()
+                    for name in ('cpu', 'memory'):
+                        if name in metrics:
+                            by = 'cpu' if name == 'cpu' else 'memory'
+                            culprits[name] = format_processes(ProcessTracker.top(rows, top_n, by), by)
+                
+                for name, label, icon in METRICS:
+                    if name not in metrics:
+                        continue
+                    value = metrics[name]
+                    change = tracker.update(name, value)
+                    if value > threshold:
+                        lines.append(f"[{timestamp}] {icon} {label} Usage: {value:.1f}% ⚠️  HIGH!")
+                        if alert_mode == 'every' or change == 'raised':
+                            culprit = f" [top: {culprits[name]}]" if culprits.get(name) else ""
+                            alerts.append(f"{label}: {value:.1f}%{culprit}")
+                    else:
+                        lines.append(f"[{timestamp}] {icon} {label} Usage: {value:.1f}% ✅")
+                    if culprits.get(name):
+                        lines.append(f"   🔝 {culprits[name]}")
+                    if change == 'cleared' and alert_mode == 'change':
+                        cleared.append(f"{label}: {value:.1f}%")
+                
+                # Handle alerts
+                if alerts:
+                    alert_count += 1
+                    instruments.count('alerts')
+                    lines.append(f"🚨 ALERT #{alert_count}: {', '.join(alerts)}")
+                    # You could add email notifications, etc. here
+                    writer.log(timestamp, f"ALERT: {', '.join(alerts)}")
+                    lines.append(f"   📝 Alert logged to {alert_log}")
+                if cleared:
+                    lines.append(f"✅ CLEARED: {', '.join(cleared)}")
+                    writer.log(timestamp, f"CLEARED: {', '.join(cleared)}")
+                
+                with instruments.span('output'):
+                    print('\n'.join(lines), flush=True)
             
     except KeyboardInterrupt:
         print(f"\n⏹️  Monitoring stopped by user")
+    finally:
+        writer.close()
     
     # Summary
-    elapsed_minutes = (time.time() - start_time) / 60
+    elapsed = time.monotonic() - start_time
+    instruments.count('missed_ticks', scheduler.missed)
+    elapsed_minutes = elapsed / 60
     print("-" * 50)
     print(f"📊 Monitoring Summary:")
     print(f"   ⏱️  Total runtime: {elapsed_minutes:.1f} minutes")
     print(f"   🔍 Total checks: {check_count}")
     print(f"   🚨 Total alerts: {alert_count}")
+    if processes and processes.scans:
+        print(f"   🔝 Process scan: {processes.processes} processes, "
+              f"{processes.scan_seconds / processes.scans * 1000:.1f} ms per tick")
+    if scheduler.missed:
+        print(f"   ⏭️  Missed ticks: {scheduler.missed} (sampling slower than the interval)")
+    
+    for name, label, icon in METRICS:
+        stats = store.stats(name, seconds=elapsed)
+        if stats['count']:
+            p95 = store.percentile(name, 95, seconds=elapsed)
+            print(f"   {icon} {label}: min {stats['min']:.1f}%, avg {stats['avg']:.1f}%, "
+                  f"p95 {p95:.1f}%, max {stats['max']:.1f}%")
+    
+    if history_file:
+        try:
+            with instruments.span('history_save'):
+                store.save(history_file)
+            print(f"   📚 Metric history saved to {history_file}")
+        except OSError as e:
+            print(f"   ❌ Failed to save metric history: {e}")
     
     return 0
 
-def log_alert(alerts, timestamp):
-    """Log alerts to a file"""
-    try:
-        with open('system_alerts.log', 'a') as f:
-            f.write(f"[{timestamp}] ALERT: {', '.join(alerts)}\n")
-        print(f"   📝 Alert logged to system_alerts.log")
-    except Exception as e:
-        print(f"   ❌ Failed to log alert: {e}")
-
 def main():
     """Main entry point"""
     if len(sys.argv) < 2: